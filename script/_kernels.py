@@ -0,0 +1,106 @@
+'''
+    REDE_SUB
+
+        ||> Objetivo: kernels numéricos compilados com Numba, compartilhados pelos scripts do Épico 3.
+
+            |> Soma ponderada (criticidade) e normalização Min-Max sobre matrizes NumPy contíguas.
+            |> Compilados em paralelo (prange) e mantidos em cache no disco (cache=True), de modo que
+               apenas a primeira execução paga o custo da compilação.
+            |> Os kernels paralelos não podem ser chamados por várias threads ao mesmo tempo (a camada
+               de threads padrão do Numba, workqueue, aborta o processo); código chamado de forma
+               concorrente, como os callbacks do dashboard, usa a variante serial weighted_sum_serial.
+'''
+
+# Import de bibliotecas
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def weighted_sum(X, w, out):
+    """
+    Calcula a soma ponderada de cada linha de X.
+
+    Kernel paralelo: não deve ser chamado simultaneamente por várias threads
+    (ver weighted_sum_serial).
+
+    Args:
+        X (np.ndarray): Matriz (ativos x variáveis).
+        w (np.ndarray): Pesos das variáveis, com X.shape[1] elementos.
+        out (np.ndarray): Vetor de saída, com X.shape[0] elementos.
+
+    Returns:
+        np.ndarray: O próprio vetor `out`, preenchido.
+    """
+    n, k = X.shape
+    for i in prange(n):
+        acc = 0.0
+        for j in range(k):
+            acc += X[i, j] * w[j]
+        out[i] = acc
+    return out
+
+
+@njit(nogil=True, fastmath=True, cache=True)
+def weighted_sum_serial(X, w, out):
+    """
+    Calcula a soma ponderada de cada linha de X em uma única thread.
+
+    Variante de weighted_sum segura para chamadas concorrentes (ex.: callbacks
+    de um servidor multi-thread); libera o GIL durante o cálculo.
+
+    Args:
+        X (np.ndarray): Matriz (ativos x variáveis).
+        w (np.ndarray): Pesos das variáveis, com X.shape[1] elementos.
+        out (np.ndarray): Vetor de saída, com X.shape[0] elementos.
+
+    Returns:
+        np.ndarray: O próprio vetor `out`, preenchido.
+    """
+    n, k = X.shape
+    for i in range(n):
+        acc = 0.0
+        for j in range(k):
+            acc += X[i, j] * w[j]
+        out[i] = acc
+    return out
+
+
+@njit(parallel=True, cache=True)
+def minmax_inplace(X):
+    """
+    Normaliza cada coluna de X para o intervalo [0, 1], no próprio array.
+
+    Valores ausentes (NaN) são ignorados no cálculo da amplitude e permanecem
+    NaN; colunas constantes (amplitude zero) resultam em zeros. Sem fastmath,
+    para que as comparações com NaN sigam o padrão IEEE.
+
+    Args:
+        X (np.ndarray): Matriz (ativos x variáveis).
+
+    Returns:
+        np.ndarray: O próprio array `X`, normalizado.
+    """
+    n, k = X.shape
+    if n == 0:
+        return X
+    for j in prange(k):
+        lo = np.inf
+        hi = -np.inf
+        for i in range(n):
+            v = X[i, j]
+            if np.isnan(v):
+                continue
+            if v < lo:
+                lo = v
+            if v > hi:
+                hi = v
+        if lo > hi:  # Coluna formada apenas por NaN
+            continue
+        rng = hi - lo
+        if rng == 0:
+            rng = 1
+        for i in range(n):
+            X[i, j] = (X[i, j] - lo) / rng
+    return X
@@ -0,0 +1,224 @@
+'''
+    REDE_SUB
+
+        ||> Objetivo: funções da matriz de priorização compartilhadas pelos scripts do Épico 5 (ep5_sp1, ep5_sp2 e ep5_sp3).
+
+            |> Templates dos dados de campo e da matriz de priorização.
+            |> Cálculo da Criticidade_Matriz, ajustes de feedback e consolidação com os dados de campo.
+            |> Leitura dos CSVs com cache em memória por caminho e data de modificação: etapas executadas
+               no mesmo processo leem cada arquivo uma única vez.
+'''
+
+# Import de bibliotecas
+
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from common import ID_DTYPE, existing_files, read_cached
+
+# Tipos das colunas da matriz de priorização (e do feedback, que usa as mesmas
+# colunas); os valores são normalizados ou ponderados, float32 basta
+MATRIZ_DTYPES = {"ID_Ativo": ID_DTYPE, "Frequencia_Falhas": "float32",
+                 "Impacto_DEC_FEC": "float32", "Numero_Clientes_Afetados": "float32",
+                 "Ponderacao_Total": "float32"}
+# Tipos das colunas dos dados de campo
+FIELD_DTYPES = {"ID_Ativo": ID_DTYPE, "Medicoes": "float32"}
+
+# Rótulos de Ajustes_Propostos, na ordem dos códigos (0: discrepância até 10%)
+AJUSTES = ["Manter", "Reavaliar"]
+# Variáveis ponderadas na Criticidade_Matriz e os pesos padrão, na mesma ordem
+WEIGHT_COLUMNS = ["Frequencia_Falhas", "Impacto_DEC_FEC", "Ponderacao_Total"]
+DEFAULT_WEIGHTS = np.array([0.4, 0.4, 0.2], dtype=np.float32)
+
+
+@lru_cache(maxsize=8)
+def _load_csv(path, mtime, dtype):
+    """
+    Lê o CSV; o resultado fica em cache por (caminho, mtime, tipos).
+
+    O DataFrame retornado é compartilhado entre as chamadas e não deve ser alterado.
+    """
+    return read_cached(path, dict(dtype) if dtype else None)
+
+
+def load_csv(path, dtype=None):
+    """
+    Carrega um CSV, reaproveitando a leitura anterior enquanto o arquivo não mudar.
+
+    O cache é indexado pelo caminho e pela data de modificação (st_mtime_ns),
+    de modo que um arquivo regravado é lido novamente. A leitura em si usa a
+    cópia Parquet de read_cached. Como os chamadores alteram o resultado
+    (novas colunas, ajustes de feedback), é devolvida uma cópia do DataFrame
+    em cache.
+
+    Args:
+        path (str): Caminho para o arquivo CSV.
+        dtype (dict, optional): Tipos das colunas (ver read_cached).
+
+    Returns:
+        pd.DataFrame: Dados carregados.
+    """
+    dtype = tuple(dtype.items()) if dtype else None
+    return _load_csv(path, os.stat(path).st_mtime_ns, dtype).copy()
+
+
+def create_field_data_template(output_path):
+    """
+    Gera um arquivo CSV template para dados de campo.
+
+    Args:
+        output_path (str): Caminho para salvar o arquivo CSV.
+    """
+    data = {
+        "ID_Ativo": ["A001", "A002", "A003"],
+        "Medicoes": [0.80, 0.70, 0.60],
+        "Observacoes": ["Sem problemas.", "Pequenos ajustes.", "Revisão necessária."]
+    }
+    df = pd.DataFrame(data)
+    df.to_csv(output_path, index=False)
+    print(f"Template de dados de campo gerado em: {output_path}")
+
+
+def create_matriz_priorizacao_template(output_path):
+    """
+    Gera um arquivo CSV template para a matriz de priorização.
+
+    Args:
+        output_path (str): Caminho para salvar o arquivo CSV.
+    """
+    data = {
+        "ID_Ativo": ["A001", "A002", "A003"],
+        "Frequencia_Falhas": [0.5, 0.3, 0.2],
+        "Impacto_DEC_FEC": [0.8, 0.7, 0.6],
+        "Numero_Clientes_Afetados": [100, 50, 30],
+        "Ponderacao_Total": [0.75, 0.65, 0.55]
+    }
+    df = pd.DataFrame(data)
+    df.to_csv(output_path, index=False)
+    print(f"Template de matriz de priorização gerado em: {output_path}")
+
+
+def weight_vector(weights):
+    """
+    Converte os pesos para um vetor float32 na ordem de WEIGHT_COLUMNS.
+
+    Args:
+        weights (dict or np.ndarray): Pesos por variável, ou já um vetor na ordem de WEIGHT_COLUMNS.
+
+    Returns:
+        np.ndarray: Vetor de pesos.
+    """
+    if isinstance(weights, dict):
+        weights = [weights[c] for c in WEIGHT_COLUMNS]
+    return np.asarray(weights, dtype=np.float32)
+
+
+def calculate_criticidade_matriz(matriz_data, weights=DEFAULT_WEIGHTS):
+    """
+    Calcula a coluna Criticidade_Matriz com base nas colunas existentes e nos pesos fornecidos.
+
+    Args:
+        matriz_data (pd.DataFrame): Dados da matriz de priorização.
+        weights (dict or np.ndarray): Pesos para cada variável (ver weight_vector).
+
+    Returns:
+        pd.DataFrame: Dados da matriz com a coluna Criticidade_Matriz adicionada.
+    """
+    # Um único produto matriz-vetor sobre o bloco numérico, sem uma Series
+    # intermediária por termo da soma; em float32, o tipo das colunas lidas
+    X = matriz_data[WEIGHT_COLUMNS].to_numpy(dtype=np.float32, copy=False)
+    matriz_data["Criticidade_Matriz"] = X @ weight_vector(weights)
+    return matriz_data
+
+
+def apply_feedback(matriz_data, feedback_path):
+    """
+    Aplica ajustes na matriz de priorização com base no feedback fornecido.
+
+    Args:
+        matriz_data (pd.DataFrame): Dados da matriz de priorização.
+        feedback_path (str): Caminho para o arquivo de feedback com ajustes.
+
+    Returns:
+        pd.DataFrame: Matriz ajustada.
+    """
+    if not os.path.exists(feedback_path):
+        print("[AVISO] Arquivo de feedback não encontrado. Nenhum ajuste será aplicado.")
+        return matriz_data
+
+    # O feedback vira um índice por ID_Ativo (último valor não nulo de cada
+    # coluna) e cada coluna ajustável é trazida por consulta (.map), sem
+    # varrer a matriz inteira para cada linha de feedback
+    feedback = load_csv(feedback_path, MATRIZ_DTYPES)
+    columns = [col for col in feedback.columns
+               if col != "ID_Ativo" and col in matriz_data.columns]
+    adjustments = feedback.groupby("ID_Ativo")[columns].last()
+    for col in columns:
+        adjusted = matriz_data["ID_Ativo"].map(adjustments[col])
+        matriz_data[col] = adjusted.where(adjusted.notna(), matriz_data[col])
+    print("[SUCESSO] Ajustes de feedback aplicados à matriz de priorização.")
+    return matriz_data
+
+
+def consolidate_data(field_data_path, matriz_data_path, output_path, weights, feedback_path=None):
+    """
+    Consolida dados da matriz de priorização com os dados de campo, aplicando
+    antes os ajustes de feedback quando feedback_path for informado.
+
+    Args:
+        field_data_path (str): Caminho para os dados de campo.
+        matriz_data_path (str): Caminho para os dados da matriz de priorização.
+        output_path (str): Caminho para salvar os dados consolidados.
+        weights (dict): Pesos para calcular Criticidade_Matriz.
+        feedback_path (str, optional): Caminho para o arquivo de feedback com
+            ajustes, aplicados à matriz antes da consolidação (ver apply_feedback).
+
+    Returns:
+        pd.DataFrame: Dados consolidados.
+    """
+    # Arquivos de entrada já presentes, com uma única listagem do diretório
+    existing = existing_files(field_data_path, matriz_data_path)
+    if field_data_path not in existing:
+        print("[AVISO] Arquivo de dados de campo não encontrado. Gerando template...")
+        create_field_data_template(field_data_path)
+
+    if matriz_data_path not in existing:
+        print(
+            "[AVISO] Arquivo da matriz de priorização não encontrado. Gerando template...")
+        create_matriz_priorizacao_template(matriz_data_path)
+
+    # Carregar dados
+    field_data = load_csv(field_data_path, FIELD_DTYPES)
+    matriz_data = load_csv(matriz_data_path, MATRIZ_DTYPES)
+
+    # Adicionar Criticidade_Matriz se necessário
+    if "Criticidade_Matriz" not in matriz_data.columns:
+        print("[INFO] Calculando coluna Criticidade_Matriz...")
+        matriz_data = calculate_criticidade_matriz(matriz_data, weights)
+
+    # Aplicar ajustes de feedback
+    if feedback_path is not None:
+        matriz_data = apply_feedback(matriz_data, feedback_path)
+
+    # Consolidar dados
+    # Junção pelo índice ID_Ativo (mesmo resultado do merge externo, inclusive
+    # os sufixos _x/_y de colunas repetidas)
+    consolidated = matriz_data.set_index("ID_Ativo").join(
+        field_data.set_index("ID_Ativo"), how="outer",
+        lsuffix="_x", rsuffix="_y").reset_index()
+    # Discrepância e ajuste calculados direto sobre os arrays NumPy; a
+    # diferença é reaproveitada como buffer do valor absoluto e da divisão
+    crit = consolidated["Criticidade_Matriz"].to_numpy(dtype=np.float64)
+    disc = crit - consolidated["Medicoes"].to_numpy(dtype=np.float64)
+    np.abs(disc, out=disc)
+    disc /= crit
+    consolidated["Discrepancia"] = disc
+    # Apenas dois rótulos: categoria com códigos int8 em vez de um objeto str por linha
+    consolidated["Ajustes_Propostos"] = pd.Categorical.from_codes(
+        (disc > 0.1).astype(np.int8), categories=AJUSTES)
+
+    # Salvar dados consolidados
+    consolidated.to_csv(output_path, index=False)
+    print(f"[SUCESSO] Dados consolidados salvos em: {output_path}")
+    return consolidated
@@ -0,0 +1,208 @@
+'''
+    REDE_SUB
+
+        ||> Objetivo: funções de documentos compartilhadas pelos scripts do Épico 4 (ep4_sp2 e ep4_sp3).
+
+            |> Extração de texto de PDF (com cache por caminho e data de modificação) e de DOCX.
+            |> Geração dos templates de melhores práticas (PDF/DOCX) e do checklist/protocolo em PDF.
+            |> Contagem de palavras-chave em uma única passada sobre o texto.
+            |> pdfplumber e python-docx são importados apenas quando usados.
+'''
+
+# Import de bibliotecas
+
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from itertools import islice
+import pandas as pd
+from fpdf import FPDF
+from joblib import Memory
+
+# Quantidade de registros por bloco da tabela no PDF; a cada bloco a tabela
+# recomeça em uma nova página, com o cabeçalho repetido
+TABLE_BLOCK_ROWS = 500
+
+# Cache em disco das extrações de texto, reaproveitado entre execuções
+memory = Memory(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "DADOS", ".cache"), verbose=0)
+
+# Funções para análise de documentos e geração de PDFs
+
+
+def extract_text_from_pdf(pdf_path):
+    """
+    Extrai texto de um arquivo PDF.
+
+    Args:
+        pdf_path (str): Caminho para o arquivo PDF.
+
+    Returns:
+        str: Texto extraído do PDF.
+    """
+    if not os.path.exists(pdf_path):
+        print("Arquivo PDF não encontrado. Gerando template...")
+        create_pdf_template(pdf_path)
+
+    # A data de modificação entra na chave do cache: um PDF regravado é lido de novo
+    return _extract_text_from_pdf(os.path.abspath(pdf_path), os.path.getmtime(pdf_path))
+
+
+@lru_cache(maxsize=32)
+@memory.cache
+def _extract_text_from_pdf(pdf_path, mtime):
+    """
+    Extrai o texto do PDF; o resultado fica em cache por (caminho, mtime),
+    em memória e em disco.
+    """
+    import pdfplumber  # Importado só quando um PDF é de fato lido (pdfminer é pesado)
+
+    # Páginas unidas uma única vez; páginas só com imagem não têm texto (None)
+    with pdfplumber.open(pdf_path) as pdf:
+        return "\n".join(page.extract_text() or "" for page in pdf.pages)
+
+
+def extract_text_from_docx(docx_path):
+    """
+    Extrai texto de um arquivo DOCX.
+
+    Args:
+        docx_path (str): Caminho para o arquivo DOCX.
+
+    Returns:
+        str: Texto extraído do DOCX.
+    """
+    if not os.path.exists(docx_path):
+        print("Arquivo DOCX não encontrado. Gerando template...")
+        create_docx_template(docx_path)
+
+    from docx import Document
+
+    doc = Document(docx_path)
+    return "\n".join([para.text for para in doc.paragraphs])
+
+
+def create_docx_template(output_path):
+    """
+    Gera um arquivo DOCX template para simular dados de melhores práticas.
+
+    Args:
+        output_path (str): Caminho para salvar o arquivo DOCX.
+    """
+    from docx import Document
+
+    doc = Document()
+    doc.add_heading(
+        "Melhores Práticas para Inspeção de Redes Subterrâneas", level=1)
+    doc.add_paragraph("1. Inspeção visual detalhada das redes subterrâneas.")
+    doc.add_paragraph("2. Medições periódicas com instrumentos calibrados.")
+    doc.add_paragraph(
+        "3. Registro das condições dos ativos e manutenção preventiva.")
+    doc.add_paragraph(
+        "4. Uso de tecnologias avançadas para detecção de falhas.")
+    doc.save(output_path)
+    print(f"Template DOCX gerado em: {output_path}")
+
+
+def create_pdf_template(output_path):
+    """
+    Gera um arquivo PDF template para simular dados de melhores práticas.
+
+    Args:
+        output_path (str): Caminho para salvar o arquivo PDF.
+    """
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    pdf.cell(200, 10, txt="Melhores Práticas para Inspeção de Redes Subterrâneas",
+             ln=True, align="C")
+    pdf.ln(10)
+    pdf.cell(
+        0, 10, txt="1. Inspeção visual detalhada das redes subterrâneas.", ln=True)
+    pdf.cell(0, 10, txt="2. Medições periódicas com instrumentos calibrados.", ln=True)
+    pdf.cell(
+        0, 10, txt="3. Registro das condições dos ativos e manutenção preventiva.", ln=True)
+    pdf.cell(
+        0, 10, txt="4. Uso de tecnologias avançadas para detecção de falhas.", ln=True)
+    pdf.output(output_path)
+    print(f"Template PDF gerado em: {output_path}")
+
+
+def analyze_text_with_keywords(text, keywords):
+    """
+    Analisa o texto para identificar palavras-chave relacionadas a inspeções.
+
+    Args:
+        text (str): Texto a ser analisado.
+        keywords (list): Lista de palavras-chave para buscar no texto.
+
+    Returns:
+        dict: Dicionário com contagem de palavras-chave encontradas.
+    """
+    # Textos iguais (por exemplo, os templates PDF e DOCX, de mesmo conteúdo)
+    # reaproveitam a contagem já feita
+    return dict(_count_keywords(text, tuple(keywords)))
+
+
+@lru_cache(maxsize=8)
+def _keyword_pattern(keywords):
+    """
+    Compila uma única expressão com todas as palavras-chave (as mais longas primeiro).
+    """
+    return re.compile(r"\b(" + "|".join(
+        map(re.escape, sorted(keywords, key=len, reverse=True))) + r")\b")
+
+
+@lru_cache(maxsize=32)
+def _count_keywords(text, keywords):
+    """
+    Conta as palavras-chave em uma única passada sobre o texto, convertido
+    para minúsculas uma vez; o resultado fica em cache por (texto, palavras-chave).
+    """
+    counts = Counter(_keyword_pattern(keywords).findall(text.lower()))
+    return {key: counts[key] for key in keywords}
+
+
+def generate_template(output_path, data):
+    """
+    Gera um template automatizado de checklist ou protocolo em PDF.
+
+    Valores do tipo DataFrame são escritos como tabela, uma linha do PDF por
+    registro, percorrendo o DataFrame linha a linha (sem montar a lista de
+    dicionários nem a sua representação em uma única string). A tabela é
+    dividida em blocos de TABLE_BLOCK_ROWS registros, cada um iniciando uma
+    nova página com o cabeçalho e escrito com um único multi_cell.
+
+    Args:
+        output_path (str): Caminho para salvar o PDF.
+        data (dict): Dados a serem incluídos no template.
+    """
+    pdf = FPDF()
+    pdf.set_compression(True)  # Conteúdo das páginas comprimido (zlib)
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+
+    pdf.set_font("Arial", size=16, style="B")
+    pdf.cell(200, 10, txt="Protocolo de Inspeção - Light", ln=True, align="C")
+    pdf.ln(10)
+
+    pdf.set_font("Arial", size=12)
+    for key, value in data.items():
+        if isinstance(value, pd.DataFrame):
+            header = " | ".join(value.columns)
+            rows = value.itertuples(index=False, name=None)
+            pdf.cell(0, 10, txt=f"{key}:", ln=True)
+            for start in range(0, max(len(value), 1), TABLE_BLOCK_ROWS):
+                if start:
+                    pdf.add_page()
+                lines = [header] + [" | ".join(map(str, row))
+                                    for row in islice(rows, TABLE_BLOCK_ROWS)]
+                pdf.multi_cell(0, 10, txt="\n".join(lines))
+        else:
+            # multi_cell quebra valores longos em várias linhas
+            pdf.multi_cell(0, 10, txt=f"{key}: {value}")
+        pdf.ln(5)
+
+    pdf.output(output_path)
+    print(f"Template de checklist gerado em: {output_path}")
@@ -0,0 +1,328 @@
+'''
+    REDE_SUB
+
+        ||> Objetivo: reunir funções compartilhadas entre os scripts dos épicos.
+
+            |> Carga da base histórica (historico_light.csv) com tipos compactos e cache em Parquet:
+                Na primeira leitura o CSV é convertido, com os tipos já ajustados, para um arquivo .parquet ao lado do original.
+                As leituras seguintes usam o Parquet enquanto ele for mais recente que o CSV.
+
+            |> Leitura dos CSVs compartilhados pelas etapas do Épico 5 (read_cached), com cache em Parquet no subdiretório .cache.
+
+            |> Leitura e gravação das bases intermediárias dos épicos 2 e 3:
+                CSV lido com o engine PyArrow e tipos explícitos; cada CSV gravado ganha uma cópia .parquet,
+                usada pela etapa seguinte no lugar de uma nova leitura do CSV.
+                Bases consumidas apenas por outras etapas são gravadas somente em Parquet (zstd).
+
+            |> Exportação para Excel em fluxo (XlsxWriter com constant_memory), linha a linha.
+'''
+
+# Import de bibliotecas
+
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+
+# Colunas de texto com poucos valores distintos, armazenadas como categoria
+CATEGORICAL_COLUMNS = ["Tipo_Ativo", "Localidade", "Historico_Manutencao"]
+# Colunas inteiras reduzidas ao menor tipo que comporta os valores
+INTEGER_COLUMNS = ["Frequencia_Falhas", "Numero_Clientes_Afetados"]
+# Os IDs ("A-0001", ...) são únicos e alfanuméricos: string em Arrow em vez de objetos Python
+ID_DTYPE = "string[pyarrow]"
+
+
+# Tipos explícitos das variáveis numéricas da base (evita a inferência de tipos na leitura).
+# Numero_Clientes_Afetados também é float32: uma contagem em branco vira NaN, em vez
+# de interromper a leitura (int32 não comporta valores ausentes)
+HIST_DTYPES = {"Frequencia_Falhas": "float32", "Tempo_Operacao": "float32",
+               "Numero_Clientes_Afetados": "float32", "Impacto_DEC_FEC": "float32"}
+# Após a normalização as quatro variáveis são reais no intervalo [0, 1]: float32 basta
+NORM_DTYPES = {"Frequencia_Falhas": "float32", "Tempo_Operacao": "float32",
+               "Numero_Clientes_Afetados": "float32", "Impacto_DEC_FEC": "float32"}
+# Matriz de priorização: variáveis normalizadas e o índice de criticidade
+CRIT_DTYPES = {**NORM_DTYPES, "Criticidade": "float32"}
+
+# Subdiretório, ao lado dos CSVs lidos por read_cached, onde ficam as cópias Parquet
+CACHE_DIR = ".cache"
+# Compressão dos arquivos Parquet gravados pelos scripts
+PARQUET_OPTIONS = {"compression": "zstd", "compression_level": 3}
+# Opções do XlsxWriter para a exportação em fluxo (ver write_sheet_rows)
+EXCEL_OPTIONS = {"constant_memory": True, "strings_to_numbers": False,
+                 "default_date_format": "yyyy-mm-dd"}
+
+
+def compact_types(df):
+    """
+    Converte as colunas da base histórica para tipos compactos.
+
+    Args:
+        df (pd.DataFrame): Base histórica lida do CSV.
+
+    Returns:
+        pd.DataFrame: O mesmo DataFrame, com as colunas convertidas.
+    """
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in INTEGER_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+    if "ID_Ativo" in df.columns:
+        df["ID_Ativo"] = df["ID_Ativo"].astype(ID_DTYPE)
+    return df
+
+
+def is_fresh(artifact_path, source_path):
+    """
+    Verifica se um artefato derivado existe e é mais recente que sua origem.
+
+    Args:
+        artifact_path (str): Caminho do arquivo derivado (cache ou resultado).
+        source_path (str): Caminho do arquivo de origem.
+
+    Returns:
+        bool: True se o artefato pode ser reutilizado.
+    """
+    return os.path.exists(artifact_path) and os.path.getmtime(artifact_path) >= os.path.getmtime(source_path)
+
+
+def existing_files(*paths):
+    """
+    Indica quais dos caminhos informados existem, listando cada diretório uma única vez.
+
+    Substitui um os.path.exists por arquivo (uma chamada stat cada) por um
+    único os.scandir por diretório, o que pesa em diretórios sincronizados
+    lentos como o do iCloud.
+
+    Args:
+        *paths (str): Caminhos dos arquivos a verificar.
+
+    Returns:
+        set: Os caminhos, dentre os informados, que existem.
+    """
+    listings = {}
+    for directory in {os.path.dirname(path) for path in paths}:
+        if os.path.isdir(directory or "."):
+            listings[directory] = {entry.name for entry in os.scandir(directory or ".")}
+        else:
+            listings[directory] = set()
+    return {path for path in paths
+            if os.path.basename(path) in listings[os.path.dirname(path)]}
+
+
+def load_hist(csv_path, columns=None, dtype=None):
+    """
+    Carrega a base histórica, usando um cache Parquet ao lado do CSV.
+
+    Se o arquivo .parquet existir e for mais recente que o CSV, ele é lido
+    diretamente. Caso contrário, o CSV é lido, os tipos são ajustados
+    (ver compact_types) e o cache é gravado.
+
+    Args:
+        csv_path (str): Caminho para o arquivo CSV da base histórica.
+        columns (list, optional): Colunas a carregar; as demais não são lidas do Parquet.
+        dtype (dict, optional): Tipos a aplicar às colunas após a leitura.
+
+    Returns:
+        pd.DataFrame: DataFrame com os dados históricos.
+    """
+    cache_dir = os.path.join(os.path.dirname(csv_path), CACHE_DIR)
+    parquet_path = os.path.join(
+        cache_dir, os.path.splitext(os.path.basename(csv_path))[0] + ".parquet")
+    if is_fresh(parquet_path, csv_path):
+        df = pd.read_parquet(parquet_path, columns=columns)
+    else:
+        df = compact_types(pd.read_csv(csv_path, parse_dates=["Data_Evento"]))
+        df.to_parquet(parquet_path, index=False, **PARQUET_OPTIONS)
+        if columns is not None:
+            df = df[columns]
+    # O tipo string do ID não é restaurado pelos metadados do Parquet
+    if "ID_Ativo" in df.columns:
+        df["ID_Ativo"] = df["ID_Ativo"].astype(ID_DTYPE)
+
+    if dtype is not None:
+        df = df.astype(dtype)
+    return df
+
+
+def read_cached(csv_path, dtype=None):
+    """
+    Lê um CSV usando uma cópia .parquet como cache.
+
+    A cópia fica no subdiretório CACHE_DIR do diretório do CSV (ignorado pelo
+    git), e não ao lado dos dados. Se ela existir e for mais recente que o CSV, é lida
+    diretamente, sem tokenizar o texto. Caso contrário, o CSV é lido com o
+    engine PyArrow e o cache é gravado, já com os tipos indicados, para as
+    leituras seguintes.
+
+    Args:
+        csv_path (str): Caminho para o arquivo CSV.
+        dtype (dict, optional): Tipos das colunas; colunas ausentes no arquivo são ignoradas.
+
+    Returns:
+        pd.DataFrame: Dados carregados.
+    """
+    cache_dir = os.path.join(os.path.dirname(csv_path), CACHE_DIR)
+    parquet_path = os.path.join(
+        cache_dir, os.path.splitext(os.path.basename(csv_path))[0] + ".parquet")
+    if is_fresh(parquet_path, csv_path):
+        df = pd.read_parquet(parquet_path)
+    else:
+        df = pd.read_csv(csv_path, engine="pyarrow")
+        if dtype is not None:
+            df = df.astype({c: t for c, t in dtype.items() if c in df.columns})
+        os.makedirs(cache_dir, exist_ok=True)
+        df.to_parquet(parquet_path, index=False, **PARQUET_OPTIONS)
+    # O tipo string do ID não é restaurado pelos metadados do Parquet
+    if dtype is not None:
+        df = df.astype({c: t for c, t in dtype.items() if c in df.columns})
+    return df
+
+
+def read_table(path, dtype=None, parse_dates=None, columns=None):
+    """
+    Lê uma base intermediária em CSV ou Parquet.
+
+    Arquivos .parquet são lidos diretamente. Para um .csv, a cópia .parquet
+    gravada por write_table é usada quando for mais recente que o CSV; caso
+    contrário, o CSV é lido com o engine PyArrow (leitura multi-thread).
+
+    Args:
+        path (str): Caminho do arquivo (.csv ou .parquet).
+        dtype (dict, optional): Tipos das colunas na leitura do CSV.
+        parse_dates (list, optional): Colunas de data a converter na leitura do CSV.
+        columns (list, optional): Colunas a carregar; as demais nem chegam a ser
+            decodificadas (projeção feita pelo próprio leitor PyArrow).
+
+    Returns:
+        pd.DataFrame: Dados carregados.
+    """
+    parquet_path = os.path.splitext(path)[0] + ".parquet"
+    if path.endswith(".parquet") or (os.path.exists(parquet_path) and (
+            not os.path.exists(path) or is_fresh(parquet_path, path))):
+        return pd.read_parquet(parquet_path, columns=columns)
+    if columns is not None:
+        dtype = {c: t for c, t in (dtype or {}).items() if c in columns} or None
+        parse_dates = [c for c in (parse_dates or []) if c in columns] or None
+    return pd.read_csv(path, engine="pyarrow", dtype=dtype,
+                       parse_dates=parse_dates, usecols=columns)
+
+
+def write_table(df, path):
+    """
+    Grava uma base intermediária em Parquet e, para um caminho .csv, também em CSV.
+
+    Um caminho .parquet indica uma base lida apenas pelas etapas seguintes:
+    nenhum CSV é gerado, e um CSV antigo com o mesmo nome é removido.
+
+    Args:
+        df (pd.DataFrame): Dados a gravar.
+        path (str): Caminho do arquivo (.csv ou .parquet).
+    """
+    base = os.path.splitext(path)[0]
+    if path.endswith(".parquet"):
+        if os.path.exists(base + ".csv"):
+            os.remove(base + ".csv")
+    else:
+        df.to_csv(path, index=False)
+    df.to_parquet(base + ".parquet", index=False, **PARQUET_OPTIONS)
+
+
+def _link_or_copy(src, dst):
+    """
+    Publica `src` também no caminho `dst`, sem regravar o conteúdo.
+
+    Usa um hardlink quando os dois caminhos estão no mesmo sistema de arquivos
+    e uma cópia simples caso contrário. O link é criado com nome temporário e
+    movido com os.replace, substituindo um `dst` existente de forma atômica.
+    """
+    tmp = dst + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    if os.stat(src).st_dev == os.stat(os.path.dirname(os.path.abspath(dst))).st_dev:
+        try:
+            os.link(src, tmp)
+        except OSError:
+            shutil.copyfile(src, tmp)
+    else:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def link_table(src, dst):
+    """
+    Publica uma base intermediária com outro nome, sem ler nem regravar os dados.
+
+    O CSV e, se existir, a cópia .parquet ao lado dele são ligados ao novo nome.
+
+    Args:
+        src (str): Caminho do CSV de origem.
+        dst (str): Caminho do CSV de destino.
+    """
+    _link_or_copy(src, dst)
+    src_parquet = os.path.splitext(src)[0] + ".parquet"
+    dst_parquet = os.path.splitext(dst)[0] + ".parquet"
+    if os.path.exists(src_parquet):
+        _link_or_copy(src_parquet, dst_parquet)
+    elif os.path.exists(dst_parquet):
+        os.remove(dst_parquet)
+
+
+def write_sheet_rows(writer, sheet_name, frame):
+    """
+    Escreve um DataFrame em uma aba do Excel, linha a linha.
+
+    Com a opção constant_memory do XlsxWriter cada linha é enviada ao disco
+    assim que a próxima começa, o que exige escrita em ordem de linhas
+    (o DataFrame.to_excel do pandas escreve coluna a coluna).
+
+    Args:
+        writer (pd.ExcelWriter): Writer aberto com o engine xlsxwriter.
+        sheet_name (str): Nome da aba a ser criada.
+        frame (pd.DataFrame): Dados a serem exportados.
+    """
+    worksheet = writer.book.add_worksheet(sheet_name)
+    worksheet.write_row(0, 0, list(frame.columns))
+    values = frame.astype(object).where(frame.notna(), None)
+    for row_idx, row in enumerate(values.itertuples(index=False, name=None), start=1):
+        worksheet.write_row(row_idx, 0, row)
+
+
+def top_k_indices(values, k=10):
+    """
+    Retorna as posições dos k maiores valores de um array, em ordem decrescente.
+
+    Usa np.argpartition (seleção O(N)) e ordena apenas os k elementos escolhidos.
+
+    Args:
+        values (np.ndarray): Valores usados no ranking.
+        k (int): Quantidade de posições a retornar.
+
+    Returns:
+        np.ndarray: Posições dos k maiores valores.
+    """
+    k = min(k, len(values))
+    if k <= 0:  # Nenhuma posição pedida ou array vazio
+        return np.empty(0, dtype=np.intp)
+    idx = np.argpartition(-values, k - 1)[:k]
+    return idx[np.argsort(-values[idx], kind="stable")]
+
+
+def top_k(df, col, k=10):
+    """
+    Seleciona as k linhas com os maiores valores de uma coluna, em ordem decrescente.
+
+    Usa np.argpartition (seleção O(N)) e ordena apenas os k elementos escolhidos,
+    evitando a ordenação completa do DataFrame.
+
+    Args:
+        df (pd.DataFrame): DataFrame de entrada.
+        col (str): Nome da coluna usada no ranking.
+        k (int): Quantidade de linhas a retornar.
+
+    Returns:
+        pd.DataFrame: As k linhas de maior valor em `col`.
+    """
+    return df.iloc[top_k_indices(df[col].to_numpy(), k)]
@@ -16,6 +16,7 @@ import numpy as np
 import missingno as msno
 import plotly.express as px
 import matplotlib.pyplot as plt  # Usado apenas para salvar gráficos do missingno
+from common import load_hist
 
 # **Docstring principal do script**
 """
@@ -24,108 +25,172 @@ Inclui verificações de valores ausentes, cálculo de estatísticas descritivas
 Os resultados ajudam a identificar variáveis relevantes e validar a qualidade dos dados.
 """
 
+
+
+def hist_bar(x, title, nbins=20, labels=None):
+    """
+    Gera um histograma como gráfico de barras a partir de contagens pré-calculadas.
+
+    O agrupamento em faixas é feito com np.histogram, de modo que apenas os
+    centros e as contagens das faixas são enviados ao navegador.
+
+    Args:
+        x (array-like): Valores da variável.
+        title (str): Título do gráfico.
+        nbins (int ou array-like): Número de faixas ou os limites das faixas.
+        labels (dict, optional): Rótulos dos eixos ("x" e "y").
+
+    Returns:
+        plotly.graph_objects.Figure: Gráfico de barras com a distribuição.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    c, e = np.histogram(x[~np.isnan(x)], bins=nbins)
+    return px.bar(x=0.5 * (e[:-1] + e[1:]), y=c, title=title,
+                  labels=labels, template="plotly_white")
+
+
 # Caminho do arquivo de dados
 data_path = "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS/historico_light.csv"
 
-# Carregamento dos dados
-df = pd.read_csv(data_path)
-print("Dados carregados com sucesso.")
-
-# **Resumo Estatístico**
-print("Resumo Estatístico:\n", df.describe())
-print("\nTipos de Dados:\n", df.dtypes)
+# Colunas usadas na análise e seus tipos compactos
+COLUNAS_ANALISE = ["ID_Ativo", "Frequencia_Falhas", "Tempo_Operacao", "Impacto_DEC_FEC",
+                   "Numero_Clientes_Afetados", "Tipo_Ativo", "Data_Evento"]
+TIPOS_ANALISE = {"Frequencia_Falhas": "float32", "Tempo_Operacao": "float32",
+                 "Impacto_DEC_FEC": "float32", "Numero_Clientes_Afetados": "int32"}
+
+
+def run(df):
+    """
+    Executa a análise exploratória sobre a base histórica já carregada.
+
+    Args:
+        df (pd.DataFrame): Base histórica (historico_light).
+
+    Returns:
+        pd.DataFrame: O próprio DataFrame recebido, sem alterações.
+    """
+    dados = df[COLUNAS_ANALISE].astype(TIPOS_ANALISE)
+
+    # **Resumo Estatístico**
+    print("Resumo Estatístico:\n", dados.describe())
+    print("\nTipos de Dados:\n", dados.dtypes)
+
+    # **Verificação de Valores Ausentes**
+    """
+    Visualiza e salva a matriz de valores ausentes, indicando onde podem existir lacunas nos dados.
+    """
+    print("\nVerificando valores ausentes:")
+    print(dados.isnull().sum())
+
+    # Gerar gráfico de valores ausentes com Missingno
+    plt.figure(figsize=(10, 6))
+    msno.matrix(dados)
+    plt.title("Matriz de Valores Ausentes")
+    missingno_output_path = "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS/missingno_matrix.png"
+    plt.savefig(missingno_output_path, dpi=300)  # Salva o gráfico como PNG
+    plt.close()
+    print(f"Matriz de valores ausentes salva em: {missingno_output_path}")
+
+    # **Análise de Correlações**
+    """
+    Calcula a matriz de correlação para variáveis numéricas e a visualiza usando um mapa de calor interativo.
+    """
+    # Calcula correlações numéricas em uma única chamada NumPy sobre a matriz de dados
+    num = dados.select_dtypes(include=np.number)
+    arr = num.to_numpy(dtype=np.float64, copy=False)
+    cm = np.corrcoef(arr, rowvar=False)
+    correlation_matrix = pd.DataFrame(cm, index=num.columns, columns=num.columns)
+    print("\nMatriz de Correlações:\n", correlation_matrix)
+
+    # Visualizar correlações com Plotly
+    fig = px.imshow(
+        correlation_matrix,
+        title="Matriz de Correlação",
+        labels=dict(color="Correlação"),
+        color_continuous_scale="RdBu",  # Escala de cores suportada pelo Plotly
+        text_auto=".2f"
+    )
+    fig.show()
 
-# **Verificação de Valores Ausentes**
-"""
-Visualiza e salva a matriz de valores ausentes, indicando onde podem existir lacunas nos dados.
-"""
-print("\nVerificando valores ausentes:")
-print(df.isnull().sum())
-
-# Gerar gráfico de valores ausentes com Missingno
-plt.figure(figsize=(10, 6))
-msno.matrix(df)
-plt.title("Matriz de Valores Ausentes")
-missingno_output_path = "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS/missingno_matrix.png"
-plt.savefig(missingno_output_path, dpi=300)  # Salva o gráfico como PNG
-plt.close()
-print(f"Matriz de valores ausentes salva em: {missingno_output_path}")
-
-# **Análise de Correlações**
-"""
-Calcula a matriz de correlação para variáveis numéricas e a visualiza usando um mapa de calor interativo.
-"""
-correlation_matrix = df.corr(
-    numeric_only=True)  # Calcula correlações numéricas
-print("\nMatriz de Correlações:\n", correlation_matrix)
-
-# Visualizar correlações com Plotly
-fig = px.imshow(
-    correlation_matrix,
-    title="Matriz de Correlação",
-    labels=dict(color="Correlação"),
-    color_continuous_scale="RdBu",  # Escala de cores suportada pelo Plotly
-    text_auto=".2f"
-)
-fig.show()
-
-# **Distribuições das Variáveis**
-"""
-Plota histogramas interativos para variáveis-chave, ajudando a entender suas distribuições.
-"""
-for col in ["Frequencia_Falhas", "Tempo_Operacao", "Impacto_DEC_FEC", "Numero_Clientes_Afetados"]:
-    fig = px.histogram(
-        df,
-        x=col,
-        nbins=20,
-        title=f"Distribuição de {col}",
-        labels={col: col, "count": "Frequência"},
+    # **Distribuições das Variáveis**
+    """
+    Plota histogramas interativos para variáveis-chave, ajudando a entender suas distribuições.
+    """
+    for col in ["Frequencia_Falhas", "Tempo_Operacao", "Impacto_DEC_FEC", "Numero_Clientes_Afetados"]:
+        fig = hist_bar(
+            dados[col],
+            title=f"Distribuição de {col}",
+            labels={"x": col, "y": "Frequência"}
+        )
+        fig.show()
+
+    # **Análise por Tipo de Ativo**
+    """
+    Calcula e visualiza o impacto médio de DEC/FEC por tipo de ativo.
+    """
+    codes, uniques = pd.factorize(dados["Tipo_Ativo"], sort=False)
+    w = dados["Impacto_DEC_FEC"].to_numpy(dtype=np.float64)
+    valid = codes >= 0  # Ignora tipos ausentes, como o groupby faria
+    sums = np.bincount(codes[valid], weights=w[valid], minlength=len(uniques))
+    cnts = np.bincount(codes[valid], minlength=len(uniques))
+    impacto_por_tipo = pd.Series(
+        sums / cnts, index=pd.Index(uniques, name="Tipo_Ativo"),
+        name="Impacto_DEC_FEC").sort_values(ascending=False)
+    print("\nImpacto DEC/FEC Médio por Tipo de Ativo:\n", impacto_por_tipo)
+
+    # Visualizar impacto DEC/FEC por tipo de ativo com Plotly
+    fig = px.bar(
+        impacto_por_tipo,
+        x=impacto_por_tipo.index,
+        y=impacto_por_tipo.values,
+        title="Impacto Médio DEC/FEC por Tipo de Ativo",
+        labels={"x": "Tipo de Ativo", "y": "Impacto DEC/FEC Médio"},
         template="plotly_white"
     )
     fig.show()
 
-# **Análise por Tipo de Ativo**
-"""
-Calcula e visualiza o impacto médio de DEC/FEC por tipo de ativo.
-"""
-impacto_por_tipo = df.groupby("Tipo_Ativo")[
-    "Impacto_DEC_FEC"].mean().sort_values(ascending=False)
-print("\nImpacto DEC/FEC Médio por Tipo de Ativo:\n", impacto_por_tipo)
-
-# Visualizar impacto DEC/FEC por tipo de ativo com Plotly
-fig = px.bar(
-    impacto_por_tipo,
-    x=impacto_por_tipo.index,
-    y=impacto_por_tipo.values,
-    title="Impacto Médio DEC/FEC por Tipo de Ativo",
-    labels={"x": "Tipo de Ativo", "y": "Impacto DEC/FEC Médio"},
-    template="plotly_white"
-)
-fig.show()
-
-# **Análise Temporal**
-"""
-Verifica a consistência das datas no conjunto de dados e plota a distribuição de eventos por ano.
-"""
-df["Data_Evento"] = pd.to_datetime(df["Data_Evento"])  # Converte para datetime
-print("\nDatas mais recentes:", df["Data_Evento"].max())
-print("Datas mais antigas:", df["Data_Evento"].min())
-
-# Plotar distribuição de eventos por ano
-df["Ano_Evento"] = df["Data_Evento"].dt.year
-fig = px.histogram(
-    df,
-    x="Ano_Evento",
-    title="Distribuição de Eventos por Ano",
-    labels={"Ano_Evento": "Ano", "count": "Número de Eventos"},
-    template="plotly_white"
-)
-fig.show()
-
-# **Exportação dos Resultados**
-"""
-Exporta um resumo descritivo completo para um arquivo CSV para consulta futura.
-"""
-output_path = "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS/analise_exploratoria_inicial.csv"
-df.describe(include="all").to_csv(output_path)
-print(f"Análise exploratória inicial exportada para: {output_path}")
+    # **Análise Temporal**
+    """
+    Verifica a consistência das datas no conjunto de dados e plota a distribuição de eventos por ano.
+    """
+    print("\nDatas mais recentes:", dados["Data_Evento"].max())
+    print("Datas mais antigas:", dados["Data_Evento"].min())
+
+    # Plotar distribuição de eventos por ano
+    # Ano extraído direto do datetime64 (anos desde 1970), sem o acessor .dt
+    dados["Ano_Evento"] = dados["Data_Evento"].to_numpy(dtype="datetime64[Y]").astype("int32") + 1970
+    fig = hist_bar(
+        dados["Ano_Evento"],
+        title="Distribuição de Eventos por Ano",
+        nbins=np.arange(dados["Ano_Evento"].min(), dados["Ano_Evento"].max() + 2) - 0.5,
+        labels={"x": "Ano", "y": "Número de Eventos"}
+    )
+    fig.show()
+
+    # **Exportação dos Resultados**
+    """
+    Exporta um resumo descritivo completo para um arquivo CSV para consulta futura.
+    """
+    output_path = "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS/analise_exploratoria_inicial.csv"
+    # Estatísticas numéricas via describe() e, para as colunas categóricas, uma
+    # única contagem de valores por coluna (count, unique, top, freq)
+    resumo_numerico = dados.describe()
+    contagens = {col: dados[col].value_counts()
+                 for col in dados.select_dtypes(include=["object", "category", "string"]).columns}
+    resumo_categorico = pd.DataFrame({
+        col: {"count": vc.sum(), "unique": len(vc), "top": vc.index[0], "freq": vc.iloc[0]}
+        for col, vc in contagens.items()
+    })
+    pd.concat([resumo_categorico, resumo_numerico], axis=1)[
+        [c for c in dados.columns if c in resumo_categorico or c in resumo_numerico]
+    ].to_csv(output_path)
+    print(f"Análise exploratória inicial exportada para: {output_path}")
+
+    return df
+
+
+if __name__ == "__main__":
+    # Carregamento dos dados (apenas as colunas usadas na análise, com tipos compactos)
+    df = load_hist(data_path, columns=COLUNAS_ANALISE, dtype=TIPOS_ANALISE)
+    print("Dados carregados com sucesso.")
+    run(df)
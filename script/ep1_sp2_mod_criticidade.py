@@ -28,13 +28,13 @@
                 Cenário 2: Pesos equilibrados para Frequencia_Falhas, Tempo_Operacao, e Impacto_DEC_FEC (30% cada).
 '''
 
-import pandas as pd
+import os
 import numpy as np
 import plotly.express as px
+from common import load_hist, top_k
 
 # Caminho para os dados
 data_path = "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS/historico_light.csv"
-df = pd.read_csv(data_path)
 
 # **Docstring**
 """
@@ -52,15 +52,14 @@ Modelo inicial de criticidade:
 def normalize(column):
     """
     Normaliza uma coluna para o intervalo [0, 1].
-    """
-    return (column - column.min()) / (column.max() - column.min())
 
+    Opera sobre o array NumPy subjacente, sem alinhamento de rótulos do pandas.
+    """
+    a = np.asarray(column, dtype=np.float64)
+    lo = a.min()
+    hi = a.max()
+    return (a - lo) / (hi - lo)
 
-# Aplicando a normalização às variáveis selecionadas
-df["Frequencia_Falhas_Norm"] = normalize(df["Frequencia_Falhas"])
-df["Tempo_Operacao_Norm"] = normalize(df["Tempo_Operacao"])
-df["Impacto_DEC_FEC_Norm"] = normalize(df["Impacto_DEC_FEC"])
-df["Numero_Clientes_Afetados_Norm"] = normalize(df["Numero_Clientes_Afetados"])
 
 # **Pesos Iniciais**
 pesos = {
@@ -70,18 +69,6 @@ pesos = {
     "Numero_Clientes_Afetados_Norm": 0.1
 }
 
-# **Cálculo da Pontuação de Criticidade**
-
-
-def calcular_criticidade(row, pesos):
-    """
-    Calcula a pontuação de criticidade com base nos pesos atribuídos.
-    """
-    return sum(row[var] * peso for var, peso in pesos.items())
-
-
-df["Criticidade"] = df.apply(calcular_criticidade, axis=1, pesos=pesos)
-
 # **Simulação de Cenários**
 """
 Simula diferentes configurações de pesos para avaliar a robustez do modelo de criticidade.
@@ -91,58 +78,102 @@ cenarios = {
     "Cenário 2": {"Frequencia_Falhas_Norm": 0.3, "Tempo_Operacao_Norm": 0.3, "Impacto_DEC_FEC_Norm": 0.3, "Numero_Clientes_Afetados_Norm": 0.1}
 }
 
-# Gerar criticidade para cada cenário
-for cenario, pesos_alt in cenarios.items():
-    df[f"Criticidade_{cenario}"] = df.apply(
-        calcular_criticidade, axis=1, pesos=pesos_alt)
-
-# **Identificar Ativos Mais Críticos por Cenário**
-for cenario in cenarios.keys():
-    print(f"\nAtivos mais críticos no {cenario}:")
-    ativos_criticos_cenario = df.sort_values(
-        by=f"Criticidade_{cenario}", ascending=False).head(10)
-    print(ativos_criticos_cenario[["ID_Ativo", f"Criticidade_{cenario}"]])
-
-    # Visualizar ativos mais críticos para o cenário atual
-    fig = px.bar(
-        ativos_criticos_cenario,
+
+def run(df):
+    """
+    Calcula a criticidade do modelo inicial e dos cenários, exibe os rankings e exporta os resultados.
+
+    Args:
+        df (pd.DataFrame): Base histórica (historico_light). Não é alterada.
+
+    Returns:
+        pd.DataFrame: Cópia da base com as variáveis normalizadas e as pontuações de criticidade.
+    """
+    df = df.copy()
+
+    # Aplicando a normalização às variáveis selecionadas
+    df["Frequencia_Falhas_Norm"] = normalize(df["Frequencia_Falhas"])
+    df["Tempo_Operacao_Norm"] = normalize(df["Tempo_Operacao"])
+    df["Impacto_DEC_FEC_Norm"] = normalize(df["Impacto_DEC_FEC"])
+    df["Numero_Clientes_Afetados_Norm"] = normalize(df["Numero_Clientes_Afetados"])
+
+    # **Cálculo da Pontuação de Criticidade**
+    """
+    A criticidade é uma combinação linear das variáveis normalizadas. Os vetores de
+    pesos do modelo inicial e de todos os cenários são empilhados em uma matriz
+    (variáveis x cenários), e todas as pontuações saem de um único produto matricial.
+    """
+    cols = ["Frequencia_Falhas_Norm", "Tempo_Operacao_Norm",
+            "Impacto_DEC_FEC_Norm", "Numero_Clientes_Afetados_Norm"]
+    mat = df[cols].to_numpy(dtype=np.float64, copy=False)
+
+    scenarios_list = [("Criticidade", pesos)] + \
+        [(f"Criticidade_{cenario}", pesos_alt)
+         for cenario, pesos_alt in cenarios.items()]
+    W = np.array([[d[c] for c in cols] for _, d in scenarios_list],
+                 dtype=np.float64).T
+    scores = mat @ W
+    for i, (coluna, _) in enumerate(scenarios_list):
+        df[coluna] = scores[:, i]
+
+    # **Identificar Ativos Mais Críticos por Cenário**
+    for cenario in cenarios.keys():
+        print(f"\nAtivos mais críticos no {cenario}:")
+        ativos_criticos_cenario = top_k(df, f"Criticidade_{cenario}")
+        print(ativos_criticos_cenario[["ID_Ativo", f"Criticidade_{cenario}"]])
+
+        # Visualizar ativos mais críticos para o cenário atual
+        fig = px.bar(
+            ativos_criticos_cenario,
+            x="ID_Ativo",
+            y=f"Criticidade_{cenario}",
+            title=f"Ativos Mais Críticos - {cenario}",
+            labels={"ID_Ativo": "ID do Ativo", f"Criticidade_{
+                cenario}": "Pontuação de Criticidade"},
+            template="plotly_white"
+        )
+        fig.show()
+
+    # **Comparar Criticidade Entre Cenários**
+    """
+    Compara as pontuações de criticidade entre os cenários para os ativos mais críticos do modelo inicial.
+    """
+    ativos_top = top_k(df, "Criticidade")
+    comparacao_cenarios = ativos_top[["ID_Ativo", "Criticidade"] +
+                                     [f"Criticidade_{cenario}" for cenario in cenarios.keys()]]
+
+    fig = px.line(
+        comparacao_cenarios.melt(
+            id_vars="ID_Ativo",
+            var_name="Cenário",
+            value_name="Valor_Criticidade"  # Nome ajustado para evitar conflito
+        ),
         x="ID_Ativo",
-        y=f"Criticidade_{cenario}",
-        title=f"Ativos Mais Críticos - {cenario}",
-        labels={"ID_Ativo": "ID do Ativo", f"Criticidade_{
-            cenario}": "Pontuação de Criticidade"},
+        y="Valor_Criticidade",
+        color="Cenário",
+        title="Comparação de Criticidade Entre Cenários",
+        labels={"ID_Ativo": "ID do Ativo",
+                "Valor_Criticidade": "Pontuação de Criticidade"},
         template="plotly_white"
     )
     fig.show()
 
-# **Comparar Criticidade Entre Cenários**
-"""
-Compara as pontuações de criticidade entre os cenários para os ativos mais críticos do modelo inicial.
-"""
-ativos_top = df.sort_values(by="Criticidade", ascending=False).head(10)
-comparacao_cenarios = ativos_top[["ID_Ativo", "Criticidade"] +
-                                 [f"Criticidade_{cenario}" for cenario in cenarios.keys()]]
-
-fig = px.line(
-    comparacao_cenarios.melt(
-        id_vars="ID_Ativo",
-        var_name="Cenário",
-        value_name="Valor_Criticidade"  # Nome ajustado para evitar conflito
-    ),
-    x="ID_Ativo",
-    y="Valor_Criticidade",
-    color="Cenário",
-    title="Comparação de Criticidade Entre Cenários",
-    labels={"ID_Ativo": "ID do Ativo",
-            "Valor_Criticidade": "Pontuação de Criticidade"},
-    template="plotly_white"
-)
-fig.show()
-
-# **Exportar Resultados**
-"""
-Exporta os resultados finais para um arquivo CSV.
-"""
-output_path = "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS/criticidade_resultados.csv"
-df.to_csv(output_path, index=False)
-print(f"Resultados exportados para: {output_path}")
+    # **Exportar Resultados**
+    """
+    Exporta os resultados finais para um arquivo CSV. Os resultados e o ranking dos
+    ativos mais críticos também são salvos em Parquet para reaproveitamento pelo ep1_sp4.
+    """
+    output_path = "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS/criticidade_resultados.csv"
+    df.to_csv(output_path, index=False)
+    print(f"Resultados exportados para: {output_path}")
+
+    df.to_parquet(os.path.splitext(output_path)[0] + ".parquet", index=False)
+    top_ativos_path = os.path.join(os.path.dirname(output_path), "top_ativos_criticidade.parquet")
+    ativos_top.to_parquet(top_ativos_path, index=False)
+    print(f"Ranking dos ativos mais críticos salvo em: {top_ativos_path}")
+
+    return df
+
+
+if __name__ == "__main__":
+    run(load_hist(data_path))
@@ -36,8 +36,9 @@ Saídas:
 
 import dash
 from dash import dcc, html, Input, Output
-import pandas as pd
+import numpy as np
 import plotly.express as px
+from common import load_hist, top_k_indices
 
 data_path = "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS/historico_light.csv"
 
@@ -46,7 +47,7 @@ data_path = "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSID
 
 def carregar_dados(caminho):
     """
-    Carrega o conjunto de dados de um arquivo CSV.
+    Carrega o conjunto de dados de um arquivo CSV (via cache Parquet).
 
     Args:
         caminho (str): Caminho para o arquivo CSV.
@@ -54,7 +55,7 @@ def carregar_dados(caminho):
     Returns:
         pd.DataFrame: DataFrame contendo os dados carregados.
     """
-    return pd.read_csv(caminho)
+    return load_hist(caminho)
 
 # Função para normalizar variáveis
 
@@ -68,9 +69,12 @@ def normalizar_variavel(df, coluna):
         coluna (str): Nome da coluna a ser normalizada.
 
     Returns:
-        pd.Series: Coluna normalizada.
+        np.ndarray: Coluna normalizada.
     """
-    return (df[coluna] - df[coluna].min()) / (df[coluna].max() - df[coluna].min())
+    a = df[coluna].to_numpy(dtype=np.float64)
+    lo = a.min()
+    hi = a.max()
+    return (a - lo) / (hi - lo)
 
 
 # Inicializar o app Dash
@@ -81,23 +85,45 @@ df = carregar_dados(data_path)
 df["Frequencia_Falhas_Norm"] = normalizar_variavel(df, "Frequencia_Falhas")
 df["Impacto_DEC_FEC_Norm"] = normalizar_variavel(df, "Impacto_DEC_FEC")
 
+# Matriz das variáveis normalizadas e IDs, calculados uma única vez para o callback
+_M = df[["Frequencia_Falhas_Norm", "Impacto_DEC_FEC_Norm"]].to_numpy(np.float64)
+_ids = df["ID_Ativo"].to_numpy()
 
-def recalcular_criticidade(peso_frequencia, peso_dec):
+
+def compute_top(M, ids, w, k=10):
+    """
+    Calcula a criticidade e seleciona os k ativos mais críticos.
+
+    Função pura: lê apenas os arrays recebidos e não altera o DataFrame.
+
+    Args:
+        M (np.ndarray): Matriz (ativos x variáveis) das variáveis normalizadas.
+        ids (np.ndarray): IDs dos ativos, na mesma ordem das linhas de M.
+        w (np.ndarray): Pesos das variáveis.
+        k (int): Quantidade de ativos mais críticos a retornar.
+
+    Returns:
+        tuple: IDs e pontuações dos k ativos mais críticos, em ordem decrescente.
+    """
+    s = M @ w
+    idx = top_k_indices(s, k)
+    return ids[idx], s[idx]
+
+
+def recalcular_criticidade(peso_frequencia, peso_dec, k=10):
     """
     Recalcula a criticidade com base nos pesos fornecidos.
 
     Args:
         peso_frequencia (float): Peso para a frequência de falhas.
         peso_dec (float): Peso para o impacto DEC/FEC.
+        k (int): Quantidade de ativos mais críticos a retornar.
 
     Returns:
-        pd.DataFrame: DataFrame atualizado com a criticidade recalculada.
+        tuple: IDs e pontuações dos k ativos mais críticos, em ordem decrescente.
     """
-    df["Criticidade"] = (
-        df["Frequencia_Falhas_Norm"] * peso_frequencia
-        + df["Impacto_DEC_FEC_Norm"] * peso_dec
-    )
-    return df.sort_values(by="Criticidade", ascending=False).head(10)
+    w = np.array([peso_frequencia, peso_dec], dtype=np.float64)
+    return compute_top(_M, _ids, w, k)
 
 
 # Layout do Dashboard
@@ -130,14 +156,13 @@ def atualizar_grafico(peso_frequencia, peso_dec):
     Returns:
         plotly.graph_objects.Figure: Gráfico de barras atualizado.
     """
-    ativos_criticos = recalcular_criticidade(peso_frequencia, peso_dec)
+    ids_top, scores_top = recalcular_criticidade(peso_frequencia, peso_dec)
     fig = px.bar(
-        ativos_criticos,
-        x="ID_Ativo",
-        y="Criticidade",
+        x=ids_top,
+        y=scores_top,
         title="Ativos Mais Críticos (Pesos Ajustados)",
-        labels={"ID_Ativo": "ID do Ativo",
-                "Criticidade": "Pontuação de Criticidade"},
+        labels={"x": "ID do Ativo",
+                "y": "Pontuação de Criticidade"},
         template="plotly_white"
     )
     return fig
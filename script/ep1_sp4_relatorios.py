@@ -32,8 +32,14 @@
 
 import pandas as pd
 from fpdf import FPDF
+import matplotlib
+matplotlib.use("Agg")  # Backend sem interface gráfica, apenas para gerar PNGs
+import matplotlib.pyplot as plt
 import plotly.express as px
+from plotly.offline import get_plotlyjs_version
 import os
+import tempfile
+from common import EXCEL_OPTIONS, is_fresh, load_hist, top_k, write_sheet_rows
 
 # Definir caminhos para os dados e saídas
 data_path = os.path.join(
@@ -48,6 +54,15 @@ output_excel_path = os.path.join(
     "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS",
     "dados_consolidados.xlsx"
 )
+output_html_path = os.path.join(
+    "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS",
+    "apresentacao.html"
+)
+# Ranking de criticidade gravado pelo ep1_sp2
+top_criticidade_path = os.path.join(
+    "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS",
+    "top_ativos_criticidade.parquet"
+)
 
 
 def ensure_directory_exists(directory):
@@ -67,6 +82,51 @@ ensure_directory_exists(
 )
 
 
+def _bar_png(x, y, title, path):
+    """
+    Renderiza um gráfico de barras com Matplotlib e o salva como PNG.
+
+    Args:
+        x: Rótulos das barras.
+        y: Valores das barras.
+        title (str): Título do gráfico.
+        path (str): Caminho do arquivo PNG a ser gerado.
+    """
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.bar([str(v) for v in x], y)
+    ax.set_title(title)
+    ax.tick_params(axis="x", labelrotation=45)
+    fig.tight_layout()
+    fig.savefig(path, format="png", dpi=150)
+    plt.close(fig)
+
+
+def write_html_presentation(figures, path, title="Apresentação - Ativos Críticos"):
+    """
+    Grava os gráficos interativos em um único arquivo HTML para apresentação.
+
+    Cada figura entra como um fragmento (full_html=False) sem o plotly.js
+    embutido; a biblioteca é carregada uma única vez, via CDN, no cabeçalho
+    da página, em vez de ~3 MB de JavaScript por gráfico.
+
+    Args:
+        figures (list): Figuras Plotly, na ordem em que serão exibidas.
+        path (str): Caminho do arquivo HTML a ser gerado.
+        title (str): Título da página.
+    """
+    fragments = [fig.to_html(full_html=False, include_plotlyjs=False)
+                 for fig in figures]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(
+            f'<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+            f'<title>{title}</title>\n'
+            f'<script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>\n'
+            f'</head>\n<body>\n'
+        )
+        f.write("\n".join(fragments))
+        f.write("\n</body>\n</html>\n")
+
+
 class PDFReport(FPDF):
     """
     Classe para criar relatórios PDF formatados com cabeçalhos, capítulos e gráficos.
@@ -91,107 +151,149 @@ class PDFReport(FPDF):
         self.multi_cell(0, 10, body)
         self.ln(5)
 
-    def add_chart(self, figure, chart_title):
+    def add_chart(self, x, y, title, chart_title):
         """
-        Adiciona um gráfico ao PDF.
+        Adiciona um gráfico de barras ao PDF.
+
+        O gráfico é renderizado em processo com Matplotlib, sem iniciar o
+        Kaleido/Chromium a cada chamada.
 
         Args:
-            figure: Figura gerada com Plotly para ser adicionada ao PDF.
+            x: Rótulos das barras.
+            y: Valores das barras.
+            title: Título exibido no próprio gráfico.
             chart_title: Título do gráfico a ser adicionado no relatório.
         """
         self.add_page()
         self.chapter_title(chart_title)
         self.ln(15)  # Espaço antes do gráfico
-        temp_chart_path = os.path.join(
-            "/Users/accol/Library Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS",
-            "temp_chart.png"
-        )
-        figure.write_image(temp_chart_path)  # Salvar o gráfico como imagem
-        # Ajustar posicionamento para evitar sobreposição
-        self.image(temp_chart_path, x=10, y=60, w=180)
+        # O FPDF 1.7 só aceita imagens a partir de um caminho de arquivo
+        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
+            temp_chart_path = tmp.name
+        try:
+            _bar_png(x, y, title, temp_chart_path)
+            # Ajustar posicionamento para evitar sobreposição
+            self.image(temp_chart_path, x=10, y=60, w=180)
+        finally:
+            # Remover o arquivo temporário após uso
+            os.remove(temp_chart_path)
         self.ln(120)  # Espaço após o gráfico
-        # Remover o arquivo temporário após uso
-        os.remove(temp_chart_path)
-
 
-# Verifica se o arquivo de dados existe
-if not os.path.exists(data_path):
-    raise FileNotFoundError(
-        f"Arquivo de dados não encontrado no caminho: {data_path}")
 
-# Carregar os dados do arquivo CSV
-df = pd.read_csv(data_path)
-
-# Instanciar o relatório PDF
-pdf = PDFReport()
-pdf.add_page()
+def run(df, criticidade=None):
+    """
+    Gera o relatório PDF final e o arquivo Excel consolidado.
 
-# Adicionar introdução ao relatório
-pdf.chapter_title("Introdução")
-pdf.chapter_body(
+    Args:
+        df (pd.DataFrame): Base histórica (historico_light).
+        criticidade (pd.DataFrame, optional): Resultado do ep1_sp2 (coluna Criticidade).
+            Se omitido, é usado o ranking salvo pelo ep1_sp2, quando atualizado.
     """
+    # Instanciar o relatório PDF
+    pdf = PDFReport()
+    pdf.add_page()
+
+    # Adicionar introdução ao relatório
+    pdf.chapter_title("Introdução")
+    pdf.chapter_body(
+        """
     Este relatório apresenta os resultados consolidados do projeto, abrangendo:
     - Objetivos do projeto e metodologia aplicada.
     - Resultados obtidos em cada sprint.
     - Visualizações e dados de apoio para priorização e tomada de decisão.
-    """
-)
+        """
+    )
 
-# Adicionar análise exploratória (Sprint 1)
-pdf.chapter_title("Sprint 1: Análise Exploratória")
-pdf.chapter_body(
-    """
+    # Adicionar análise exploratória (Sprint 1)
+    pdf.chapter_title("Sprint 1: Análise Exploratória")
+    pdf.chapter_body(
+        """
     A análise exploratória identificou as principais variáveis e características dos ativos de 
     média tensão da rede subterrânea, com foco na frequência de falhas, tempo de operação, 
     impacto DEC/FEC e número de clientes afetados.
-    """
-)
-top_ativos = df.sort_values("Impacto_DEC_FEC", ascending=False).head(10)
-fig1 = px.bar(
-    top_ativos,
-    x="ID_Ativo",
-    y="Impacto_DEC_FEC",
-    title="Ativos com Maior Impacto DEC/FEC"
-)
-pdf.add_chart(fig1, "Gráfico: Ativos com Maior Impacto DEC/FEC")
+        """
+    )
+    top_ativos = top_k(df, "Impacto_DEC_FEC")
+    pdf.add_chart(
+        top_ativos["ID_Ativo"],
+        top_ativos["Impacto_DEC_FEC"],
+        "Ativos com Maior Impacto DEC/FEC",
+        "Gráfico: Ativos com Maior Impacto DEC/FEC"
+    )
 
-# Adicionar modelo inicial de criticidade (Sprint 2)
-pdf.chapter_title("Sprint 2: Modelo Inicial de Criticidade")
-pdf.chapter_body(
-    """
+    # Adicionar modelo inicial de criticidade (Sprint 2)
+    pdf.chapter_title("Sprint 2: Modelo Inicial de Criticidade")
+    pdf.chapter_body(
+        """
     Um modelo preliminar de criticidade foi desenvolvido, considerando pesos ajustáveis para as 
     variáveis frequência de falhas e impacto DEC/FEC. Cenários foram simulados para validar a robustez.
-    """
-)
+        """
+    )
 
-# Adicionar validação e ajustes (Sprint 3)
-pdf.chapter_title("Sprint 3: Validação e Ajustes")
-pdf.chapter_body(
-    """
+    # Usar o ranking do modelo de criticidade recebido do ep1_sp2 ou, na execução
+    # isolada, o gravado em disco quando ele for mais recente que os dados; caso
+    # contrário, manter o ranking por impacto DEC/FEC
+    if criticidade is not None:
+        top_criticos = top_k(criticidade, "Criticidade")
+        coluna_criticos = "Criticidade"
+    elif is_fresh(top_criticidade_path, data_path):
+        top_criticos = pd.read_parquet(top_criticidade_path)
+        coluna_criticos = "Criticidade"
+    else:
+        top_criticos = top_ativos
+        coluna_criticos = "Impacto_DEC_FEC"
+
+    # Adicionar validação e ajustes (Sprint 3)
+    pdf.chapter_title("Sprint 3: Validação e Ajustes")
+    pdf.chapter_body(
+        """
     Os resultados das validações técnicas ajustaram os pesos para refletir a realidade operacional. 
     O modelo foi refinado e priorizou os ativos com maior criticidade.
-    """
-)
-fig2 = px.bar(
-    top_ativos,
-    x="ID_Ativo",
-    y="Impacto_DEC_FEC",
-    title="Ativos Mais Críticos Após Ajuste de Pesos"
-)
-pdf.add_chart(fig2, "Gráfico: Ativos Mais Críticos")
-
-# Salvar o PDF na pasta de saída
-pdf.output(output_pdf_path)
-
-# Exportar dados consolidados para um arquivo Excel
-try:
-    with pd.ExcelWriter(output_excel_path, engine='xlsxwriter') as writer:
-        df.to_excel(writer, sheet_name='Dados Originais', index=False)
-        top_ativos.to_excel(writer, sheet_name='Ativos Críticos', index=False)
-except ModuleNotFoundError:
-    raise ModuleNotFoundError(
-        "A biblioteca 'xlsxwriter' não foi encontrada. Instale-a com 'pip install xlsxwriter'.")
-
-# Exibir mensagens de sucesso
-print(f"Relatório PDF salvo em: {output_pdf_path}")
-print(f"Arquivo Excel salvo em: {output_excel_path}")
+        """
+    )
+    pdf.add_chart(
+        top_criticos["ID_Ativo"],
+        top_criticos[coluna_criticos],
+        "Ativos Mais Críticos Após Ajuste de Pesos",
+        "Gráfico: Ativos Mais Críticos"
+    )
+
+    # Salvar o PDF na pasta de saída
+    pdf.output(output_pdf_path)
+
+    # Exportar dados consolidados para um arquivo Excel
+    try:
+        with pd.ExcelWriter(
+            output_excel_path,
+            engine='xlsxwriter',
+            engine_kwargs={"options": EXCEL_OPTIONS}
+        ) as writer:
+            write_sheet_rows(writer, 'Dados Originais', df)
+            write_sheet_rows(writer, 'Ativos Críticos', top_ativos)
+    except ModuleNotFoundError:
+        raise ModuleNotFoundError(
+            "A biblioteca 'xlsxwriter' não foi encontrada. Instale-a com 'pip install xlsxwriter'.")
+
+    # Visualizações dinâmicas para a apresentação do workshop
+    figures = [
+        px.bar(top_ativos, x="ID_Ativo", y="Impacto_DEC_FEC",
+               title="Ativos com Maior Impacto DEC/FEC", template="plotly_white"),
+        px.bar(top_criticos, x="ID_Ativo", y=coluna_criticos,
+               title="Ativos Mais Críticos Após Ajuste de Pesos", template="plotly_white"),
+    ]
+    write_html_presentation(figures, output_html_path)
+
+    # Exibir mensagens de sucesso
+    print(f"Relatório PDF salvo em: {output_pdf_path}")
+    print(f"Arquivo Excel salvo em: {output_excel_path}")
+    print(f"Apresentação interativa salva em: {output_html_path}")
+
+
+if __name__ == "__main__":
+    # Verifica se o arquivo de dados existe
+    if not os.path.exists(data_path):
+        raise FileNotFoundError(
+            f"Arquivo de dados não encontrado no caminho: {data_path}")
+
+    # Carregar os dados do arquivo CSV (via cache Parquet)
+    run(load_hist(data_path))
@@ -28,6 +28,7 @@
 
 import pandas as pd
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 
 def ensure_directory_exists(directory):
@@ -41,6 +42,23 @@ def ensure_directory_exists(directory):
         os.makedirs(directory)
 
 
+def read_json_records(json_path):
+    """
+    Lê um arquivo JSON, tentando primeiro o formato de uma linha por registro.
+
+    Args:
+        json_path (str): Caminho para o arquivo JSON.
+
+    Returns:
+        pd.DataFrame: DataFrame com os registros do arquivo.
+    """
+    # Ler JSON linha por linha (orientação de múltiplas linhas)
+    try:
+        return pd.read_json(json_path, lines=True)
+    except ValueError:
+        return pd.read_json(json_path, orient="records")
+
+
 def load_and_consolidate_data(data_directory):
     """
     Carrega dados de múltiplos formatos (CSV, Excel, JSON) e consolida em um único DataFrame.
@@ -61,23 +79,23 @@ def load_and_consolidate_data(data_directory):
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
 
-    # Carregar dados
+    # Carregar dados: as três leituras são independentes e rodam em paralelo
     print("Carregando dados...")
-    df_csv = pd.read_csv(csv_path)
-    df_xlsx = pd.read_excel(xlsx_path)
-
-    # Ler JSON linha por linha (orientação de múltiplas linhas)
-    try:
-        df_json = pd.read_json(json_path, lines=True)
-    except ValueError:
-        df_json = pd.read_json(json_path, orient="records")
-
-    # Consolidar os dados
+    tasks = {"csv": lambda: pd.read_csv(csv_path),
+             "xlsx": lambda: pd.read_excel(xlsx_path),
+             "json": lambda: read_json_records(json_path)}
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = {key: executor.submit(fn) for key, fn in tasks.items()}
+        loaded = {key: future.result() for key, future in futures.items()}
+    df_csv, df_xlsx, df_json = loaded["csv"], loaded["xlsx"], loaded["json"]
+
+    # Consolidar os dados e remover duplicatas: a concatenação alinha as colunas
+    # pelo nome e unifica os tipos entre as fontes (ex.: int e float), e só então
+    # cada linha é reduzida a um hash uint64, comparado em uma única passada
     print("Consolidando dados...")
     consolidated_df = pd.concat([df_csv, df_xlsx, df_json], ignore_index=True)
-
-    # Remover duplicatas
-    consolidated_df.drop_duplicates(inplace=True)
+    h = pd.util.hash_pandas_object(consolidated_df, index=False)
+    consolidated_df = consolidated_df[~h.duplicated().to_numpy()].reset_index(drop=True)
 
     return consolidated_df
 
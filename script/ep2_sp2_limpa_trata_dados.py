@@ -36,9 +36,15 @@
 
 # Import bibliotecas
 
+import numpy as np
 import pandas as pd
 import os
 
+# Quantidade de linhas processadas por vez na limpeza (limita o pico de memória)
+CHUNK_SIZE = 200_000
+# Chave natural de um registro: um evento de um ativo em uma data
+DEDUP_KEY = ["ID_Ativo", "Data_Evento"]
+
 
 def ensure_directory_exists(directory):
     """
@@ -51,51 +57,98 @@ def ensure_directory_exists(directory):
         os.makedirs(directory)
 
 
-def clean_and_treat_data(input_path, output_path):
+def to_numeric_columns(chunk, columns):
     """
-    Realiza limpeza e tratamento inicial dos dados.
+    Converte as colunas indicadas para número, valores inválidos viram NaN.
+
+    Colunas que o leitor de CSV já entregou com tipo numérico são mantidas
+    como estão; apenas as colunas de texto passam pela conversão.
 
     Args:
-        input_path (str): Caminho do arquivo de dados consolidado.
-        output_path (str): Caminho para salvar a base tratada.
+        chunk (pd.DataFrame): Bloco de dados.
+        columns (list): Colunas a converter.
 
     Returns:
-        pd.DataFrame: DataFrame tratado e limpo.
+        pd.DataFrame: Bloco com as colunas convertidas.
     """
-    # Carregar os dados
-    print("Carregando dados...")
-    df = pd.read_csv(input_path)
+    pending = [c for c in columns if not pd.api.types.is_numeric_dtype(chunk[c])]
+    if not pending:
+        return chunk
+    return chunk.assign(**chunk[pending].apply(pd.to_numeric, errors="coerce"))
 
-    # Remover duplicatas
-    print("Removendo duplicatas...")
-    df.drop_duplicates(inplace=True)
 
-    # Corrigir formatos (exemplo: converter colunas numéricas para float)
-    print("Corrigindo formatos...")
-    numeric_columns = ["Frequencia_Falhas", "Impacto_DEC_FEC"]
-    for col in numeric_columns:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
+def clean_and_treat_data(input_path, output_path, chunk_size=CHUNK_SIZE):
+    """
+    Realiza limpeza e tratamento inicial dos dados, em blocos de linhas.
+
+    A base é processada em duas passadas, mantendo em memória apenas um bloco
+    por vez: a primeira remove duplicatas (pelo hash da chave DEDUP_KEY,
+    acumulado entre os blocos), corrige os formatos e acumula soma e contagem das colunas
+    numéricas; a segunda preenche os valores faltantes com as médias globais.
 
-    # Preencher valores faltantes com a média
+    Args:
+        input_path (str): Caminho do arquivo de dados consolidado.
+        output_path (str): Caminho para salvar a base tratada.
+        chunk_size (int): Quantidade de linhas lidas por bloco.
+    """
+    numeric_columns = ["Frequencia_Falhas", "Impacto_DEC_FEC"]
+    temp_path = output_path + ".tmp"
+
+    # Primeira passada: duplicatas, formatos e acumuladores para as médias.
+    # As colunas não numéricas são lidas como texto, de modo que chaves iguais
+    # tenham o mesmo hash em qualquer bloco e sejam gravadas como estão.
+    # Apenas as colunas da chave são hasheadas, e não a linha inteira.
+    # As colunas numéricas ficam com o tipo inferido pelo leitor.
+    print("Carregando dados, removendo duplicatas e corrigindo formatos...")
+    seen = set()
+    sums = pd.Series(0.0, index=numeric_columns)
+    counts = pd.Series(0, index=numeric_columns)
+    header = True
+    text_dtypes = {c: str for c in pd.read_csv(input_path, nrows=0).columns
+                   if c not in numeric_columns}
+    for chunk in pd.read_csv(input_path, dtype=text_dtypes, chunksize=chunk_size):
+        h = pd.util.hash_pandas_object(chunk[DEDUP_KEY], index=False).to_numpy()
+        mask = np.fromiter((x not in seen and not seen.add(x) for x in h),
+                           dtype=bool, count=len(h))
+        chunk = chunk.iloc[mask]
+        if chunk.empty:  # Bloco formado apenas por duplicatas
+            continue
+        chunk = to_numeric_columns(chunk, numeric_columns)
+        sums += chunk[numeric_columns].sum()
+        counts += chunk[numeric_columns].count()
+        chunk.to_csv(temp_path, mode="w" if header else "a", header=header, index=False)
+        header = False
+
+    # Segunda passada: preencher valores faltantes com a média global
     print("Preenchendo valores faltantes...")
-    for col in numeric_columns:
-        df[col].fillna(df[col].mean(), inplace=True)
+    means = sums / counts
+    filled_path = output_path + ".filled.tmp"
+    header = True
+    for chunk in pd.read_csv(temp_path, dtype=text_dtypes, chunksize=chunk_size):
+        chunk = to_numeric_columns(chunk, numeric_columns)
+        chunk = chunk.assign(**chunk[numeric_columns].fillna(means))
+        chunk.to_csv(filled_path, mode="w" if header else "a", header=header, index=False)
+        header = False
+    os.remove(temp_path)
+    # Substitui a base tratada por um novo arquivo (e não reescrevendo o
+    # existente), preservando a base final publicada como hardlink pelo ep2_sp4
+    os.replace(filled_path, output_path)
+
+    # Uma cópia Parquet de uma execução anterior não corresponde mais à base tratada
+    parquet_path = os.path.splitext(output_path)[0] + ".parquet"
+    if os.path.exists(parquet_path):
+        os.remove(parquet_path)
 
     # Documentar as alterações
     print("Documentando alterações...")
     with open(os.path.join(os.path.dirname(output_path), "documentacao_tratamento.txt"), "w") as doc_file:
         doc_file.write("Tratamento Realizado:\n")
-        doc_file.write("- Remoção de duplicatas\n")
+        doc_file.write("- Remoção de duplicatas (chave ID_Ativo + Data_Evento)\n")
         doc_file.write("- Correção de formatos nas colunas numéricas\n")
         doc_file.write("- Preenchimento de valores faltantes com a média\n")
 
-    # Salvar dados tratados
-    print("Salvando dados tratados...")
-    df.to_csv(output_path, index=False)
     print(f"Base tratada salva em: {output_path}")
 
-    return df
-
 
 def main():
     """
@@ -23,10 +23,20 @@
 
 # Import bibliotecas
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
+import plotly.io as pio
 from fpdf import FPDF
 import os
+import tempfile
+from common import HIST_DTYPES, read_table
+
+# Kaleido: um único processo (scope) é reutilizado por todos os write_image do
+# script; os padrões são definidos uma vez, antes do primeiro gráfico
+pio.kaleido.scope.default_format = "png"
+pio.kaleido.scope.default_width = 800
+pio.kaleido.scope.default_height = 500
 
 # Definir o caminho da base de dados tratada
 base_path = "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS"
@@ -52,13 +62,49 @@ class PDFReport(FPDF):
         self.multi_cell(0, 10, body)
         self.ln(5)
 
-    def add_chart(self, figure, chart_title: str):
-        temp_chart_path = os.path.join(base_path, "temp_chart.png")
-        figure.write_image(temp_chart_path)
-        self.add_page()
-        self.chapter_title(chart_title)
-        self.image(temp_chart_path, x=10, y=60, w=180)
-        os.remove(temp_chart_path)
+    def add_charts(self, charts):
+        # Renderiza todos os gráficos de uma vez no processo Kaleido compartilhado
+        # e só depois monta as páginas. O FPDF 1.7 lê imagens apenas de arquivos,
+        # então os PNGs ficam em um diretório temporário removido ao final.
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = []
+            for i, (figure, _) in enumerate(charts):
+                path = os.path.join(temp_dir, f"chart_{i}.png")
+                with open(path, "wb") as f:
+                    f.write(pio.to_image(figure, format="png"))
+                paths.append(path)
+            for path, (_, chart_title) in zip(paths, charts):
+                self.add_page()
+                self.chapter_title(chart_title)
+                self.image(path, x=10, y=60, w=180)
+
+
+def correlation_matrix(df, columns):
+    """
+    Calcula a matriz de correlação de Pearson das colunas indicadas.
+
+    Sem valores ausentes, as correlações saem de uma única chamada NumPy sobre
+    a matriz de dados; colunas constantes (desvio padrão zero) ficam fora do
+    cálculo e recebem NaN, como em df.corr(). Com valores ausentes, usa
+    df.corr(), que descarta os NaN par a par em vez da linha inteira.
+
+    Args:
+        df (pd.DataFrame): Base de dados.
+        columns (pd.Index): Colunas numéricas.
+
+    Returns:
+        pd.DataFrame: Matriz de correlação (colunas x colunas).
+    """
+    arr = df[columns].to_numpy(dtype=np.float64)
+    if np.isnan(arr).any():
+        return df[columns].corr()
+    corr = np.full((len(columns), len(columns)), np.nan)
+    varying = arr.std(axis=0) > 0
+    if varying.sum() > 1:
+        corr[np.ix_(varying, varying)] = np.corrcoef(arr[:, varying], rowvar=False)
+    elif varying.sum() == 1:
+        corr[varying, varying] = 1.0
+    return pd.DataFrame(corr, index=columns, columns=columns)
 
 
 # Verificar se o arquivo existe
@@ -66,10 +112,10 @@ if not os.path.exists(data_path):
     raise FileNotFoundError(f"Arquivo de dados não encontrado: {data_path}")
 
 # Carregar a base de dados tratada
-df = pd.read_csv(data_path)
+df = read_table(data_path, dtype=HIST_DTYPES, parse_dates=["Data_Evento"])
 
 # Filtrar colunas numéricas
-numerical_columns = df.select_dtypes(include=['float64', 'int64']).columns
+numerical_columns = df.select_dtypes(include='number').columns
 
 if numerical_columns.empty:
     raise ValueError(
@@ -96,22 +142,24 @@ pdf.chapter_body(summary.to_string())
 
 # Histogramas
 pdf.chapter_title("Distribuição das Variáveis")
-for column in numerical_columns:
-    fig = px.histogram(df, x=column, title=f"Distribuição: {column}")
-    pdf.add_chart(fig, f"Distribuição: {column}")
+pdf.add_charts([
+    (px.histogram(df, x=column, title=f"Distribuição: {column}"),
+     f"Distribuição: {column}")
+    for column in numerical_columns
+])
 
 # Boxplots
 pdf.chapter_title("Detecção de Outliers")
-for column in numerical_columns:
-    fig = px.box(df, y=column, title=f"Outliers: {column}")
-    pdf.add_chart(fig, f"Outliers: {column}")
+pdf.add_charts([
+    (px.box(df, y=column, title=f"Outliers: {column}"), f"Outliers: {column}")
+    for column in numerical_columns
+])
 
 # Matriz de correlação
 pdf.chapter_title("Matriz de Correlação")
-correlation_matrix = df[numerical_columns].corr()
-fig = px.imshow(correlation_matrix,
+fig = px.imshow(correlation_matrix(df, numerical_columns),
                 title="Matriz de Correlação", text_auto=True)
-pdf.add_chart(fig, "Matriz de Correlação")
+pdf.add_charts([(fig, "Matriz de Correlação")])
 
 # Salvar relatório
 pdf.output(output_pdf_path)
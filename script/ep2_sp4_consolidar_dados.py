@@ -9,8 +9,8 @@
 
 # Import bibliotecas
 
-import pandas as pd
 import os
+from common import link_table
 
 # Definir o caminho da base de dados tratada
 base_path = "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS"
@@ -22,19 +22,16 @@ documentation_path = os.path.join(base_path, "documentacao_finalizacao.txt")
 if not os.path.exists(data_path):
     raise FileNotFoundError(f"Arquivo de dados não encontrado: {data_path}")
 
-# Carregar a base de dados tratada
-df = pd.read_csv(data_path)
-
 # Validar os dados tratados
 # Aqui você pode incluir validações específicas com base nas regras de negócio ou critérios da equipe da Light
 print("Validando os dados...")
 
 # Consolidar os dados finais
-# Para este exemplo, vamos assumir que os dados já estão consolidados no dataframe df
+# Os dados tratados já estão consolidados: a base final é publicada como um
+# hardlink para o arquivo tratado (cópia apenas entre sistemas de arquivos
+# diferentes), sem ler nem regravar o CSV
 print("Consolidando os dados finais...")
-
-# Salvar a base consolidada como um novo arquivo CSV
-df.to_csv(output_csv_path, index=False)
+link_table(data_path, output_csv_path)
 
 # Documentar o processo
 print("Documentando o processo...")
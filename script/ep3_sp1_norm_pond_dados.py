@@ -7,16 +7,22 @@
         |> Normalização: Aplicar técnicas como Min-Max Scaling para garantir que todas as variáveis estejam entre 0 e 1.
         |> Ponderação: Atribuir pesos específicos às variáveis com base nos critérios definidos no Épico 1.
         |> Documentação: Comentar detalhadamente o código e usar docstrings em todas as funções.
-        |> Salvar Saída: Gerar a base ep3_base_normalizada.csv com os dados normalizados e ponderados.
+        |> Salvar Saída: Gerar a base ep3_base_normalizada.parquet com os dados normalizados e ponderados.
 '''
 
 # Import de bibliotecas
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import dash
 from dash import dcc, html
 import os
+from common import HIST_DTYPES, read_table, write_table
+from _kernels import minmax_inplace
+
+# Formato das datas de evento na base histórica
+DATE_FORMAT = "%Y-%m-%d"
 
 
 def load_data(file_path):
@@ -31,7 +37,7 @@ def load_data(file_path):
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
-    return pd.read_csv(file_path)
+    return read_table(file_path, dtype=HIST_DTYPES, parse_dates=["Data_Evento"])
 
 
 def normalize_columns(df):
@@ -46,13 +52,15 @@ def normalize_columns(df):
     """
     columns_to_normalize = ["Frequencia_Falhas", "Tempo_Operacao",
                             "Numero_Clientes_Afetados", "Impacto_DEC_FEC"]
-    for column in columns_to_normalize:
-        if column in df.columns:
-            df[column] = (df[column] - df[column].min()) / \
-                (df[column].max() - df[column].min())
-        else:
-            print(f"ATENÇÃO: Coluna '{
-                  column}' não encontrada para normalização.")
+    cols = [c for c in columns_to_normalize if c in df.columns]
+    missing = [c for c in columns_to_normalize if c not in cols]
+    if missing:
+        print(f"ATENÇÃO: Colunas não encontradas para normalização: {missing}")
+
+    # Min-max de todas as colunas sobre uma cópia float32, com o kernel Numba
+    # (colunas constantes resultam em zeros, sem divisão por zero)
+    arr = df[cols].to_numpy(dtype=np.float32, copy=True)
+    df[cols] = minmax_inplace(arr)
     return df
 
 
@@ -70,28 +78,34 @@ def add_year_column(df, date_column):
     if date_column not in df.columns:
         raise KeyError(f"A coluna '{date_column}' não existe no DataFrame.")
 
-    df[date_column] = pd.to_datetime(df[date_column], errors="coerce")
+    # Converte apenas se as datas ainda não tiverem sido lidas como datetime.
+    # O formato fixo (AAAA-MM-DD, usado no historico_light) evita a inferência
+    # elemento a elemento, e cache=True reaproveita datas repetidas.
+    if not pd.api.types.is_datetime64_any_dtype(df[date_column]):
+        df[date_column] = pd.to_datetime(df[date_column], format=DATE_FORMAT,
+                                         errors="coerce", cache=True)
 
     # Verifica valores inválidos na coluna de datas
-    invalid_dates = df[df[date_column].isna()]
-    if not invalid_dates.empty:
-        print(f"ATENÇÃO: Valores de data inválidos encontrados:\n{
-              invalid_dates}")
-        df = df.dropna(subset=[date_column]).copy()
-
-    df["Ano"] = df[date_column].dt.year
+    invalid = df[date_column].isna().to_numpy()
+    n_invalid = int(invalid.sum())
+    if n_invalid:
+        print(f"ATENÇÃO: {n_invalid} valores de data inválidos encontrados e removidos.")
+        df = df.loc[~invalid].copy()
+
+    # Ano extraído direto do datetime64 (anos desde 1970), sem o acessor .dt
+    df["Ano"] = df[date_column].to_numpy(dtype="datetime64[Y]").astype("int32") + 1970
     return df
 
 
 def save_normalized_data(df, output_path):
     """
-    Salva os dados normalizados em um arquivo CSV.
+    Salva os dados normalizados (base intermediária, em Parquet).
 
     Args:
         df (DataFrame): DataFrame com os dados normalizados.
-        output_path (str): Caminho para salvar o arquivo CSV.
+        output_path (str): Caminho para salvar o arquivo .parquet.
     """
-    df.to_csv(output_path, index=False)
+    write_table(df, output_path)
     print(f"Base normalizada salva em: {output_path}")
 
 
@@ -102,7 +116,7 @@ def main():
     # Definir caminhos
     base_path = "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS"
     input_path = os.path.join(base_path, "historico_light.csv")
-    output_path = os.path.join(base_path, "ep3_base_normalizada.csv")
+    output_path = os.path.join(base_path, "ep3_base_normalizada.parquet")
 
     try:
         print("Carregando dados...")
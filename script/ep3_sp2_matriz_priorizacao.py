@@ -41,28 +41,30 @@
 
 # Import de bibliotecas
 
-import pandas as pd
+import numpy as np
 import dash
 from dash import dcc, html
 import plotly.express as px
 import os
+from common import NORM_DTYPES, read_table, write_table
+from _kernels import weighted_sum
 
 # Funções Utilitárias
 
 
 def load_normalized_data(file_path):
     """
-    Carrega a base de dados normalizada a partir de um arquivo CSV.
+    Carrega a base de dados normalizada (Parquet ou CSV).
 
     Args:
-        file_path (str): Caminho para o arquivo CSV com os dados normalizados.
+        file_path (str): Caminho para o arquivo com os dados normalizados.
 
     Returns:
         pd.DataFrame: DataFrame com os dados normalizados.
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
-    return pd.read_csv(file_path)
+    return read_table(file_path, dtype=NORM_DTYPES, parse_dates=["Data_Evento"])
 
 
 def calculate_criticality(df, weights):
@@ -76,8 +78,12 @@ def calculate_criticality(df, weights):
     Returns:
         pd.DataFrame: DataFrame atualizado com a coluna de criticidade.
     """
-    df['Criticidade'] = sum(df[var] * weight for var,
-                            weight in weights.items())
+    # Soma ponderada das variáveis (N x variáveis) pelos pesos, com o kernel Numba,
+    # inteiramente em float32 (as variáveis normalizadas estão em [0, 1])
+    vars_ = list(weights)
+    w = np.fromiter(weights.values(), dtype=np.float32, count=len(vars_))
+    X = np.ascontiguousarray(df[vars_].to_numpy(dtype=np.float32))
+    df['Criticidade'] = weighted_sum(X, w, np.empty(len(df), dtype=np.float32))
     return df
 
 
@@ -89,13 +95,13 @@ def save_criticality_matrix(df, output_path):
         df (pd.DataFrame): DataFrame contendo a matriz de criticidade.
         output_path (str): Caminho para salvar o arquivo CSV.
     """
-    df.to_csv(output_path, index=False)
+    write_table(df, output_path)
     print(f"Matriz de priorização salva em: {output_path}")
 
 
 # Configurações de Caminhos
 base_path = "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS"
-input_path = os.path.join(base_path, "ep3_base_normalizada.csv")
+input_path = os.path.join(base_path, "ep3_base_normalizada.parquet")
 output_path = os.path.join(base_path, "matriz_priorizacao.csv")
 
 # Pesos para cálculo da criticidade (ajustar conforme necessário)
@@ -117,6 +123,10 @@ try:
     print("Salvando matriz de priorização...")
     save_criticality_matrix(df, output_path)
 
+    # Ranking ordenado uma única vez no Python (ordem crescente, de baixo para
+    # cima no gráfico horizontal), sem reordenação de categorias no navegador
+    df_sorted = df.iloc[np.argsort(df["Criticidade"].to_numpy(), kind="stable")]
+
     # Dash para visualização
     app = dash.Dash(__name__)
 
@@ -125,14 +135,14 @@ try:
         dcc.Graph(
             id="criticidade-bar-chart",
             figure=px.bar(
-                df,
+                df_sorted,
                 x="Criticidade",
                 y="ID_Ativo",
                 orientation="h",
                 title="Ranking de Criticidade dos Ativos",
                 labels={"ID_Ativo": "Ativo",
                         "Criticidade": "Índice de Criticidade"},
-            ).update_layout(yaxis={'categoryorder': 'total ascending'})
+            )
         ),
         dcc.Graph(
             id="criticidade-scatter",
@@ -149,8 +159,11 @@ try:
         )
     ])
 
-    print("Executando Dash App...")
-    app.run_server(debug=True)
+    # Servidor multi-thread, sem o modo de depuração e seu recarregador de
+    # arquivos; iniciado apenas quando o script é executado diretamente
+    if __name__ == "__main__":
+        print("Executando Dash App...")
+        app.run(debug=False, threaded=True)
 
 except Exception as e:
     print(f"Erro durante o processamento: {e}")
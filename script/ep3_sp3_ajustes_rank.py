@@ -24,44 +24,47 @@
 
 # Import de bibliotecas
 
+import numpy as np
 import pandas as pd
 import dash
-from dash import dcc, html, Input, Output
+from dash import dcc, html, Input, Output, Patch
 import plotly.express as px
 import os
+from functools import lru_cache
+from common import NORM_DTYPES, read_table, top_k_indices
+from _kernels import weighted_sum_serial
 
 # Funções Utilitárias
 
 
-def load_normalized_data(file_path):
+def load_normalized_data(file_path, columns=None):
     """
-    Carrega a base de dados normalizada a partir de um arquivo CSV.
+    Carrega a base de dados normalizada (Parquet ou CSV).
 
     Args:
-        file_path (str): Caminho para o arquivo CSV com os dados normalizados.
+        file_path (str): Caminho para o arquivo com os dados normalizados.
+        columns (list, optional): Colunas a carregar (padrão: todas).
 
     Returns:
         pd.DataFrame: DataFrame com os dados normalizados.
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
-    return pd.read_csv(file_path)
+    # A data de modificação entra na chave do cache: se o arquivo for
+    # regravado, a próxima chamada lê a nova versão
+    return _load_normalized_data(file_path, os.path.getmtime(file_path),
+                                 None if columns is None else tuple(columns))
 
 
-def calculate_criticality(df, weights):
+@lru_cache(maxsize=4)
+def _load_normalized_data(file_path, mtime, columns):
     """
-    Calcula a criticidade com base nos pesos e variáveis fornecidos.
+    Lê a base normalizada; o resultado fica em cache por (caminho, mtime, colunas).
 
-    Args:
-        df (pd.DataFrame): DataFrame com as variáveis normalizadas.
-        weights (dict): Dicionário contendo os pesos de cada variável.
-
-    Returns:
-        pd.DataFrame: DataFrame atualizado com a coluna de criticidade.
+    O DataFrame retornado é compartilhado entre as chamadas e não deve ser alterado.
     """
-    df['Criticidade'] = sum(df[var] * weight for var,
-                            weight in weights.items())
-    return df
+    return read_table(file_path, dtype=NORM_DTYPES, parse_dates=["Data_Evento"],
+                      columns=None if columns is None else list(columns))
 
 
 def save_criticality_matrix(df, output_path):
@@ -78,9 +81,12 @@ def save_criticality_matrix(df, output_path):
 
 # Configurações de Caminhos
 base_path = "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS"
-input_path = os.path.join(base_path, "ep3_base_normalizada.csv")
+input_path = os.path.join(base_path, "ep3_base_normalizada.parquet")
 output_path = os.path.join(base_path, "matriz_priorizacao_ajustada.csv")
 
+# Quantidade de ativos exibidos no ranking (os mais críticos)
+TOP_N = 50
+
 # Pesos iniciais para cálculo da criticidade (ajustáveis no dashboard)
 default_weights = {
     "Frequencia_Falhas": 0.4,
@@ -91,7 +97,8 @@ default_weights = {
 
 # Carregar os dados
 print("Carregando dados normalizados...")
-df = load_normalized_data(input_path)
+# O dashboard usa apenas o ID e as variáveis ponderadas
+df = load_normalized_data(input_path, columns=["ID_Ativo"] + list(default_weights))
 
 
 def create_app(df):
@@ -106,6 +113,41 @@ def create_app(df):
     """
     app = dash.Dash(__name__)
 
+    # Matriz das variáveis normalizadas, extraída uma única vez; a cada ajuste
+    # de pesos apenas o produto matriz-vetor é refeito
+    vars_ = list(default_weights)
+    X = np.ascontiguousarray(df[vars_].to_numpy(dtype=np.float32))
+    ids = df["ID_Ativo"].to_numpy()
+
+    # Figuras construídas uma única vez, com os pesos iniciais; os ajustes
+    # seguintes enviam ao navegador apenas os novos valores de criticidade
+    w = np.array([default_weights[var] for var in vars_], dtype=np.float32)
+    criticidade = weighted_sum_serial(X, w, np.empty(len(df), dtype=np.float32))
+    serie_criticidade = pd.Series(
+        criticidade, index=df.index, name="Criticidade")
+
+    # Barras dos TOP_N ativos mais críticos, já ordenadas no Python (crescente,
+    # de baixo para cima); a seleção é O(N) e só os TOP_N valores são ordenados
+    order = top_k_indices(criticidade, TOP_N)[::-1]
+    bar_chart = px.bar(
+        x=criticidade[order],
+        y=ids[order],
+        orientation="h",
+        title=f"Ranking de Criticidade dos Ativos (Ajustado) - Top {TOP_N}",
+        labels={"y": "Ativo", "x": "Índice de Criticidade"},
+    )
+
+    scatter_chart = px.scatter(
+        df,
+        x=serie_criticidade,
+        y="Frequencia_Falhas",
+        size="Numero_Clientes_Afetados",
+        color="Impacto_DEC_FEC",
+        title="Relação entre Criticidade e Variáveis (Ajustado)",
+        labels={"Frequencia_Falhas": "Frequência de Falhas",
+                "Criticidade": "Índice de Criticidade"},
+    )
+
     app.layout = html.Div([
         html.H1("Validação e Ajustes do Ranking de Criticidade"),
         html.Div([
@@ -122,8 +164,8 @@ def create_app(df):
             dcc.Slider(id="peso-dec-fec", min=0, max=1, step=0.1,
                        value=default_weights["Impacto_DEC_FEC"]),
         ], style={"margin-bottom": "20px"}),
-        dcc.Graph(id="criticidade-bar-chart"),
-        dcc.Graph(id="criticidade-scatter")
+        dcc.Graph(id="criticidade-bar-chart", figure=bar_chart),
+        dcc.Graph(id="criticidade-scatter", figure=scatter_chart)
     ])
 
     @app.callback(
@@ -132,7 +174,9 @@ def create_app(df):
         [Input("peso-falhas", "value"),
          Input("peso-operacao", "value"),
          Input("peso-clientes", "value"),
-         Input("peso-dec-fec", "value")]
+         Input("peso-dec-fec", "value")],
+        # As figuras iniciais já saem prontas com os pesos padrão
+        prevent_initial_call=True
     )
     def update_charts(w_falhas, w_operacao, w_clientes, w_dec_fec):
         weights = {
@@ -142,37 +186,32 @@ def create_app(df):
             "Impacto_DEC_FEC": w_dec_fec
         }
 
-        # Recalcular criticidade
-        df_updated = calculate_criticality(df.copy(), weights)
-
-        # Atualizar gráficos
-        bar_chart = px.bar(
-            df_updated,
-            x="Criticidade",
-            y="ID_Ativo",
-            orientation="h",
-            title="Ranking de Criticidade dos Ativos (Ajustado)",
-            labels={"ID_Ativo": "Ativo",
-                    "Criticidade": "Índice de Criticidade"},
-        ).update_layout(yaxis={'categoryorder': 'total ascending'})
-
-        scatter_chart = px.scatter(
-            df_updated,
-            x="Criticidade",
-            y="Frequencia_Falhas",
-            size="Numero_Clientes_Afetados",
-            color="Impacto_DEC_FEC",
-            title="Relação entre Criticidade e Variáveis (Ajustado)",
-            labels={"Frequencia_Falhas": "Frequência de Falhas",
-                    "Criticidade": "Índice de Criticidade"},
-        )
-
-        return bar_chart, scatter_chart
+        # Recalcular criticidade sem copiar o DataFrame; o vetor de saída é
+        # alocado a cada chamada, pois chamadas simultâneas não podem
+        # compartilhar o mesmo buffer, e o kernel serial pode ser chamado
+        # por várias threads ao mesmo tempo
+        w = np.array([weights[var] for var in vars_], dtype=np.float32)
+        criticidade = weighted_sum_serial(X, w, np.empty(len(X), dtype=np.float32))
+        order = top_k_indices(criticidade, TOP_N)[::-1]
+
+        # Atualizar apenas os dados dos gráficos: as barras seguem o novo
+        # ranking dos TOP_N ativos e o scatter recebe os novos valores de criticidade
+        bar_patch = Patch()
+        bar_patch["data"][0]["x"] = criticidade[order].tolist()
+        bar_patch["data"][0]["y"] = ids[order].tolist()
+        scatter_patch = Patch()
+        scatter_patch["data"][0]["x"] = criticidade.tolist()
+
+        return bar_patch, scatter_patch
 
     return app
 
 
-# Criar e executar a aplicação
-app = create_app(df)
-print("Executando Dash App com ajuste dinâmico de pesos...")
-app.run_server(debug=True)
+# Criar e executar a aplicação (servidor multi-thread, sem o modo de depuração
+# e seu recarregador de arquivos). Os callbacks podem rodar simultaneamente:
+# update_charts apenas lê X e ids, aloca o próprio vetor de saída e usa o
+# kernel serial weighted_sum_serial, seguro para chamadas concorrentes
+if __name__ == "__main__":
+    app = create_app(df)
+    print("Executando Dash App com ajuste dinâmico de pesos...")
+    app.run(debug=False, threaded=True)
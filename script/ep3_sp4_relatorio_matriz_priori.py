@@ -29,27 +29,49 @@
 
 # Import de bibliotecas
 
-import pandas as pd
+import numpy as np
 import plotly.express as px
+import plotly.io as pio
 from fpdf import FPDF
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from common import CATEGORICAL_COLUMNS, CRIT_DTYPES, NORM_DTYPES, read_table
+
+# Com a variável de ambiente SKIP_PLOTS definida (ex.: reconstruções automáticas),
+# o relatório é gerado sem os gráficos e o Kaleido não chega a ser iniciado
+SKIP_PLOTS = bool(os.environ.get("SKIP_PLOTS"))
+
+# Kaleido: um único processo (scope) é reutilizado por todos os write_image do
+# script; os padrões são definidos uma vez, antes do primeiro gráfico. Com
+# SKIP_PLOTS o scope não é acessado, e o script roda mesmo sem o Kaleido
+if not SKIP_PLOTS:
+    pio.kaleido.scope.default_format = "png"
+    pio.kaleido.scope.default_width = 800
+    pio.kaleido.scope.default_height = 500
 
 # Funções Utilitárias
 
 
 def load_normalized_data(file_path):
     """
-    Carrega a base de dados normalizada a partir de um arquivo CSV.
+    Carrega a base de dados normalizada (Parquet ou CSV).
 
     Args:
-        file_path (str): Caminho para o arquivo CSV com os dados normalizados.
+        file_path (str): Caminho para o arquivo com os dados normalizados.
 
     Returns:
         pd.DataFrame: DataFrame com os dados normalizados.
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
-    return pd.read_csv(file_path)
+    df = read_table(file_path, dtype=NORM_DTYPES, parse_dates=["Data_Evento"])
+    # Tipos compactos também para a criticidade e para o texto de poucos valores
+    # (qualquer que seja a origem, CSV ou Parquet): frame menor em memória e
+    # figuras menores enviadas ao Kaleido. Os IDs, únicos, continuam como texto.
+    compact = {c: t for c, t in CRIT_DTYPES.items() if c in df.columns}
+    compact.update({c: "category" for c in CATEGORICAL_COLUMNS if c in df.columns})
+    return df.astype(compact)
 
 
 def calculate_criticality(df, weights):
@@ -63,8 +85,11 @@ def calculate_criticality(df, weights):
     Returns:
         pd.DataFrame: DataFrame atualizado com a coluna de criticidade.
     """
-    df['Criticidade'] = sum(df[var] * weight for var,
-                            weight in weights.items())
+    # Um único produto matriz-vetor (N x variáveis) @ (variáveis), em float32
+    # como as variáveis normalizadas, sem uma Series intermediária por peso
+    cols = list(weights)
+    w = np.fromiter((weights[c] for c in cols), dtype=np.float32, count=len(cols))
+    df['Criticidade'] = df[cols].to_numpy(dtype=np.float32, copy=False) @ w
     return df
 
 
@@ -80,6 +105,76 @@ def save_criticality_matrix(df, output_path):
     print(f"Matriz de priorização salva em: {output_path}")
 
 
+def render_images(figures):
+    """
+    Renderiza as figuras em PNG, em lote, no processo Kaleido compartilhado.
+
+    As figuras são independentes e são enviadas em paralelo: enquanto uma
+    aguarda a resposta do Chromium (sem segurar o GIL), a seguinte já é
+    validada e serializada.
+
+    Args:
+        figures (list): Figuras Plotly a renderizar.
+
+    Returns:
+        list: Conteúdo PNG (bytes) de cada figura, na mesma ordem.
+    """
+    with ThreadPoolExecutor(max_workers=len(figures)) as executor:
+        futures = [executor.submit(pio.to_image, figure, format="png")
+                   for figure in figures]
+        return [future.result() for future in futures]
+
+
+def add_charts(pdf, df, df_sorted):
+    """
+    Gera os gráficos de ranking e de dispersão e os insere no PDF, um por página.
+
+    Args:
+        pdf (FPDF): Documento em construção.
+        df (pd.DataFrame): DataFrame com os resultados da matriz de priorização.
+        df_sorted (pd.DataFrame): O mesmo DataFrame, em ordem decrescente de criticidade.
+    """
+    # Barras já na ordem do ranking (invertida: de baixo para cima no gráfico
+    # horizontal), sem reordenação de categorias pelo Plotly
+    bar_chart = px.bar(
+        df_sorted.iloc[::-1],
+        x="Criticidade",
+        y="ID_Ativo",
+        orientation="h",
+        title="Ranking de Criticidade dos Ativos",
+        labels={"ID_Ativo": "Ativo", "Criticidade": "Índice de Criticidade"},
+    )
+    scatter_chart = px.scatter(
+        df,
+        x="Criticidade",
+        y="Frequencia_Falhas",
+        size="Numero_Clientes_Afetados",
+        color="Impacto_DEC_FEC",
+        title="Relação entre Criticidade e Variáveis",
+        labels={"Frequencia_Falhas": "Frequência de Falhas",
+                "Criticidade": "Índice de Criticidade"},
+    )
+
+    # As duas imagens são renderizadas de uma vez (em memória) antes de montar
+    # as páginas. O FPDF 1.7 lê imagens apenas de arquivos, então os PNGs ficam
+    # em um diretório temporário removido ao final, e não no diretório corrente.
+    images = render_images([bar_chart, scatter_chart])
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bar_chart_path = os.path.join(temp_dir, "bar_chart.png")
+        scatter_chart_path = os.path.join(temp_dir, "scatter_chart.png")
+        for path, png in zip([bar_chart_path, scatter_chart_path], images):
+            with open(path, "wb") as f:
+                f.write(png)
+
+        pdf.add_page()
+        pdf.cell(0, 10, txt="Ranking de Criticidade dos Ativos:", ln=True)
+        pdf.image(bar_chart_path, x=10, y=30, w=180)
+
+        pdf.add_page()
+        pdf.cell(0, 10, txt="Relação entre Criticidade e Variáveis:", ln=True)
+        pdf.image(scatter_chart_path, x=10, y=30, w=180)
+
+
 def generate_pdf_report(df, output_path):
     """
     Gera um relatório técnico em PDF com base nos resultados da matriz de priorização.
@@ -89,6 +184,7 @@ def generate_pdf_report(df, output_path):
         output_path (str): Caminho para salvar o relatório em PDF.
     """
     pdf = FPDF()
+    pdf.set_compression(True)  # Conteúdo das páginas comprimido (zlib)
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
 
@@ -120,11 +216,15 @@ Os dados foram normalizados e ponderados para garantir comparabilidade e objetiv
 
     # Ranking Final
     pdf.set_font("Arial", size=12)
-    top_10 = df.nlargest(10, "Criticidade")
+    # Uma única ordenação (decrescente, estável) serve ao Top 10 e ao gráfico
+    df_sorted = df.iloc[np.argsort(-df["Criticidade"].to_numpy(), kind="stable")]
+    top_10 = df_sorted.head(10)
     pdf.cell(0, 10, txt="Top 10 Ativos Críticos:", ln=True)
-    for index, row in top_10.iterrows():
-        pdf.cell(0, 10, txt=f"- Ativo: {row['ID_Ativo']
-                                        } | Criticidade: {row['Criticidade']:.2f}", ln=True)
+    # Linhas montadas de uma vez sobre as colunas, sem iterrows
+    linhas = ("- Ativo: " + top_10["ID_Ativo"].astype(str) + " | Criticidade: " +
+              top_10["Criticidade"].map("{:.2f}".format)).tolist()
+    for linha in linhas:
+        pdf.cell(0, 10, txt=linha, ln=True)
     pdf.ln(10)
 
     # Gráficos
@@ -132,38 +232,11 @@ Os dados foram normalizados e ponderados para garantir comparabilidade e objetiv
     pdf.cell(0, 10, txt="Gráficos Relevantes:", ln=True)
     pdf.ln(5)
 
-    # Gerar gráficos temporários
-    bar_chart = px.bar(
-        df,
-        x="Criticidade",
-        y="ID_Ativo",
-        orientation="h",
-        title="Ranking de Criticidade dos Ativos",
-        labels={"ID_Ativo": "Ativo", "Criticidade": "Índice de Criticidade"},
-    ).update_layout(yaxis={'categoryorder': 'total ascending'})
-    scatter_chart = px.scatter(
-        df,
-        x="Criticidade",
-        y="Frequencia_Falhas",
-        size="Numero_Clientes_Afetados",
-        color="Impacto_DEC_FEC",
-        title="Relação entre Criticidade e Variáveis",
-        labels={"Frequencia_Falhas": "Frequência de Falhas",
-                "Criticidade": "Índice de Criticidade"},
-    )
-
-    bar_chart_path = "bar_chart.png"
-    scatter_chart_path = "scatter_chart.png"
-    bar_chart.write_image(bar_chart_path)
-    scatter_chart.write_image(scatter_chart_path)
-
-    pdf.add_page()
-    pdf.cell(0, 10, txt="Ranking de Criticidade dos Ativos:", ln=True)
-    pdf.image(bar_chart_path, x=10, y=30, w=180)
-
-    pdf.add_page()
-    pdf.cell(0, 10, txt="Relação entre Criticidade e Variáveis:", ln=True)
-    pdf.image(scatter_chart_path, x=10, y=30, w=180)
+    # Os gráficos podem ser omitidos (SKIP_PLOTS), dispensando o Kaleido
+    if SKIP_PLOTS:
+        pdf.cell(0, 10, txt="[Gráficos omitidos (SKIP_PLOTS)]", ln=True)
+    else:
+        add_charts(pdf, df, df_sorted)
 
     # Conclusão
     pdf.add_page()
@@ -199,7 +272,7 @@ weights = {
 # Garantir que o arquivo de matriz exista
 if not os.path.exists(input_path):
     print("Matriz de priorização não encontrada. Gerando matriz...")
-    normalized_data_path = os.path.join(base_path, "ep3_base_normalizada.csv")
+    normalized_data_path = os.path.join(base_path, "ep3_base_normalizada.parquet")
     df_normalized = load_normalized_data(normalized_data_path)
     df_criticality = calculate_criticality(df_normalized, weights)
     save_criticality_matrix(df_criticality, input_path)
@@ -33,12 +33,19 @@ import numpy as np
 import plotly.express as px
 from scipy.stats import norm
 import os
+from common import CRIT_DTYPES, existing_files, read_table
+
+# Rótulos dos estratos de criticidade, do código 0 ao 2
+ESTRATOS = ['Baixa', 'Média', 'Alta']
 
 
 def load_criticality_matrix(file_path):
     """
     Carrega a matriz de criticidade a partir de um arquivo CSV.
 
+    A leitura usa o engine PyArrow com tipos explícitos (float32 para as
+    variáveis normalizadas e a criticidade), ou a cópia Parquet da matriz.
+
     Args:
         file_path (str): Caminho para o arquivo CSV da matriz de criticidade.
 
@@ -47,7 +54,7 @@ def load_criticality_matrix(file_path):
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
-    return pd.read_csv(file_path)
+    return read_table(file_path, dtype=CRIT_DTYPES)
 
 
 def stratified_sampling(df, strata_column, sample_size):
@@ -56,22 +63,27 @@ def stratified_sampling(df, strata_column, sample_size):
 
     Args:
         df (pd.DataFrame): DataFrame com os dados de entrada.
-        strata_column (str): Nome da coluna usada para estratificação.
+        strata_column (str): Nome da coluna usada para estratificação, com os
+            estratos codificados como inteiros 0, 1, ..., k-1.
         sample_size (int): Tamanho total da amostra desejada.
 
     Returns:
         pd.DataFrame: DataFrame com a amostra estratificada.
     """
-    strata = df[strata_column].value_counts(normalize=True)
-    strata_sample_sizes = (strata * sample_size).round().astype(int)
-
-    sampled_df = pd.DataFrame()
-    for strata_value, n_samples in strata_sample_sizes.items():
-        sampled_strata = df[df[strata_column] == strata_value].sample(
-            n=min(n_samples, len(df[df[strata_column] == strata_value])), random_state=42)
-        sampled_df = pd.concat([sampled_df, sampled_strata])
-
-    return sampled_df
+    # A base é embaralhada uma única vez e, de cada estrato, ficam as primeiras
+    # linhas até a cota proporcional. Tudo em NumPy sobre os códigos inteiros:
+    # tamanhos por np.bincount e posição de cada linha dentro do seu estrato
+    # pela ordenação estável dos códigos
+    shuffled = df.sample(frac=1, random_state=42)
+    codes = shuffled[strata_column].to_numpy()
+    counts = np.bincount(codes)
+    quota = np.round(counts / len(codes) * sample_size).astype(int)
+
+    order = np.argsort(codes, kind="stable")
+    starts = np.cumsum(counts) - counts
+    position = np.empty(len(codes), dtype=np.int64)
+    position[order] = np.arange(len(codes)) - np.repeat(starts, counts)
+    return shuffled[position < quota[codes]]
 
 
 def update_sampling_based_on_feedback(df, feedback_path):
@@ -89,13 +101,17 @@ def update_sampling_based_on_feedback(df, feedback_path):
         print("Arquivo de feedback não encontrado. Continuando sem ajustes.")
         return df
 
-    feedback = pd.read_csv(feedback_path)
-    df = df.merge(feedback, on="ID_Ativo", how="left")
+    # O feedback é pequeno: vira um índice por ID_Ativo e cada coluna é trazida
+    # por consulta (.map) direto no próprio df, sem o DataFrame novo do merge
+    feedback = pd.read_csv(feedback_path).drop_duplicates(
+        "ID_Ativo", keep="last").set_index("ID_Ativo")
+    for column in feedback.columns:
+        df[column] = df["ID_Ativo"].map(feedback[column])
 
     # Aplicar ajustes baseados no feedback (exemplo: ajustar criticidade)
     if 'Ajuste_Criticidade' in feedback.columns:
-        df['Criticidade'] = df['Ajuste_Criticidade'].combine_first(
-            df['Criticidade'])
+        adjusted = df['Ajuste_Criticidade']
+        df['Criticidade'] = adjusted.where(adjusted.notna(), df['Criticidade'])
 
     return df
 
@@ -139,8 +155,8 @@ def main():
     feedback_path = os.path.join(base_path, "feedback_campo.csv")
     output_path = os.path.join(base_path, "plano_amostragem.csv")
 
-    # Gerar template de feedback, se necessário
-    if not os.path.exists(feedback_path):
+    # Gerar template de feedback, se necessário (uma única listagem do diretório)
+    if feedback_path not in existing_files(feedback_path):
         print("Gerando template de feedback...")
         create_feedback_template(feedback_path)
 
@@ -152,15 +168,17 @@ def main():
     print("Incorporando feedback da equipe de campo...")
     df = update_sampling_based_on_feedback(df, feedback_path)
 
-    # Definir critérios para estratos (Exemplo: Criticidade em 3 níveis)
+    # Definir critérios para estratos (Exemplo: Criticidade em 3 níveis), como
+    # códigos inteiros; os rótulos só são aplicados ao plano final
     print("Definindo estratos com base na criticidade...")
-    df['Estrato'] = pd.qcut(df['Criticidade'], q=3, labels=[
-                            'Baixa', 'Média', 'Alta'])
+    df['Estrato'] = pd.qcut(df['Criticidade'], q=3, labels=False).astype(np.int8)
 
     # Aplicar amostragem estratificada
     print("Executando amostragem estratificada...")
     sample_size = 50  # Ajustar conforme necessidade
     sampled_df = stratified_sampling(df, 'Estrato', sample_size)
+    sampled_df = sampled_df.assign(
+        Estrato=np.take(ESTRATOS, sampled_df['Estrato'].to_numpy()))
 
     # Salvar o plano de amostragem
     print("Salvando o plano de amostragem...")
@@ -14,118 +14,46 @@
 # Import de bibliotecas
 
 import os
-import pandas as pd
+import numpy as np
 from fpdf import FPDF
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.impute import KNNImputer
+from sklearn.preprocessing import StandardScaler
+from _matriz_utils import consolidate_data
 
-# Funções para análise de dados
-
-
-def create_field_data_template(output_path):
-    """
-    Gera um arquivo CSV template para dados de campo.
-
-    Args:
-        output_path (str): Caminho para salvar o arquivo CSV.
-    """
-    data = {
-        "ID_Ativo": ["A001", "A002", "A003"],
-        "Medicoes": [0.80, 0.70, 0.60],
-        "Observacoes": ["Sem problemas.", "Pequenos ajustes.", "Revisão necessária."]
-    }
-    df = pd.DataFrame(data)
-    df.to_csv(output_path, index=False)
-    print(f"Template de dados de campo gerado em: {output_path}")
-
-
-def create_matriz_priorizacao_template(output_path):
-    """
-    Gera um arquivo CSV template para a matriz de priorização.
+# Variáveis usadas pelo kNN para localizar os ativos semelhantes
+KNN_FEATURES = ["Frequencia_Falhas", "Impacto_DEC_FEC", "Numero_Clientes_Afetados"]
+# Quantidade de vizinhos cuja medição média é atribuída ao ativo não inspecionado
+KNN_NEIGHBORS = 5
 
-    Args:
-        output_path (str): Caminho para salvar o arquivo CSV.
-    """
-    data = {
-        "ID_Ativo": ["A001", "A002", "A003"],
-        "Frequencia_Falhas": [0.5, 0.3, 0.2],
-        "Impacto_DEC_FEC": [0.8, 0.7, 0.6],
-        "Numero_Clientes_Afetados": [100, 50, 30],
-        "Ponderacao_Total": [0.75, 0.65, 0.55]
-    }
-    df = pd.DataFrame(data)
-    df.to_csv(output_path, index=False)
-    print(f"Template de matriz de priorização gerado em: {output_path}")
+# Funções para análise de dados
 
 
-def calculate_criticidade_matriz(matriz_data, weights):
+def impute_medicoes(data):
     """
-    Calcula a coluna Criticidade_Matriz com base nas colunas existentes e nos pesos fornecidos.
+    Preenche os valores faltantes de Medicoes com a média dos k vizinhos mais próximos.
 
-    Args:
-        matriz_data (pd.DataFrame): Dados da matriz de priorização.
-        weights (dict): Pesos para cada variável.
-
-    Returns:
-        pd.DataFrame: Dados da matriz com a coluna Criticidade_Matriz adicionada.
-    """
-    matriz_data["Criticidade_Matriz"] = (
-        weights["Frequencia_Falhas"] * matriz_data["Frequencia_Falhas"] +
-        weights["Impacto_DEC_FEC"] * matriz_data["Impacto_DEC_FEC"] +
-        weights["Ponderacao_Total"] * matriz_data["Ponderacao_Total"]
-    )
-    return matriz_data
-
-
-def consolidate_data(field_data_path, matriz_data_path, output_path, weights):
-    """
-    Consolida dados da matriz de priorização com os dados de campo.
+    As variáveis são padronizadas (StandardScaler) antes do kNN, para que
+    nenhuma domine a distância apenas pela escala; as medições inferidas
+    voltam à escala original e as existentes são mantidas como estão.
 
     Args:
-        field_data_path (str): Caminho para os dados de campo.
-        matriz_data_path (str): Caminho para os dados da matriz de priorização.
-        output_path (str): Caminho para salvar os dados consolidados.
-        weights (dict): Pesos para calcular Criticidade_Matriz.
+        data (pd.DataFrame): Dados com a coluna Medicoes parcialmente preenchida.
 
     Returns:
-        pd.DataFrame: Dados consolidados.
+        np.ndarray: Medicoes com os valores faltantes inferidos.
     """
-    if not os.path.exists(field_data_path):
-        print("[AVISO] Arquivo de dados de campo não encontrado. Gerando template...")
-        create_field_data_template(field_data_path)
-
-    if not os.path.exists(matriz_data_path):
-        print(
-            "[AVISO] Arquivo da matriz de priorização não encontrado. Gerando template...")
-        create_matriz_priorizacao_template(matriz_data_path)
-
-    # Carregar dados
-    field_data = pd.read_csv(field_data_path)
-    matriz_data = pd.read_csv(matriz_data_path)
-
-    # Adicionar Criticidade_Matriz se necessário
-    if "Criticidade_Matriz" not in matriz_data.columns:
-        print("[INFO] Calculando coluna Criticidade_Matriz...")
-        matriz_data = calculate_criticidade_matriz(matriz_data, weights)
-
-    # Consolidar dados
-    consolidated = pd.merge(matriz_data, field_data,
-                            on="ID_Ativo", how="outer")
-    consolidated["Discrepancia"] = abs(
-        consolidated["Criticidade_Matriz"] - consolidated["Medicoes"]) / consolidated["Criticidade_Matriz"]
-    consolidated["Ajustes_Propostos"] = consolidated["Discrepancia"].apply(
-        lambda x: "Reavaliar" if x > 0.1 else "Manter")
-
-    # Salvar dados consolidados
-    consolidated.to_csv(output_path, index=False)
-    print(f"[SUCESSO] Dados consolidados salvos em: {output_path}")
-    return consolidated
+    columns = [c for c in KNN_FEATURES if c in data.columns] + ["Medicoes"]
+    X = data[columns].to_numpy(dtype=np.float64)
+    scaler = StandardScaler()
+    imputer = KNNImputer(n_neighbors=KNN_NEIGHBORS, keep_empty_features=True)
+    imputed = scaler.inverse_transform(
+        imputer.fit_transform(scaler.fit_transform(X)))[:, -1]
+    return np.where(np.isnan(X[:, -1]), imputed, X[:, -1])
 
 
 def perform_inference(consolidated_data, output_path):
     """
-    Realiza inferências sobre unidades não inspecionadas usando regressão linear.
+    Realiza inferências sobre unidades não inspecionadas usando kNN (ver impute_medicoes).
 
     Args:
         consolidated_data (pd.DataFrame): Dados consolidados com informações inspecionadas e não inspecionadas.
@@ -134,14 +62,14 @@ def perform_inference(consolidated_data, output_path):
     Returns:
         pd.DataFrame: Dados com inferências adicionadas.
     """
-    # Separar dados inspecionados e não inspecionados
-    inspected = consolidated_data.dropna(subset=["Medicoes"])
-    not_inspected = consolidated_data[consolidated_data["Medicoes"].isna()]
-
-    # Validar dados de treinamento
-    inspected = inspected.dropna(subset=["Criticidade_Matriz"])
+    # Separar dados inspecionados (com medição e criticidade, usados no
+    # treinamento) e não inspecionados a partir de uma única máscara de Medicoes
+    missing = consolidated_data["Medicoes"].isna().to_numpy()
+    valid = ~missing & consolidated_data["Criticidade_Matriz"].notna().to_numpy()
+    inspected = consolidated_data[valid]
 
     if inspected.empty:
+        not_inspected = consolidated_data[missing]
         print("[ERRO] Nenhum dado válido disponível para treinamento. Por favor, revise a base de dados consolidada.")
         print("[INFO] Gerando template de inferência com valores padrão...")
         # Preenchendo com valores padrão para continuar o fluxo
@@ -151,29 +79,29 @@ def perform_inference(consolidated_data, output_path):
               output_path}")
         return not_inspected
 
-    # Treinar modelo de regressão linear
-    X = inspected["Criticidade_Matriz"].values.reshape(-1, 1)
-    y = inspected["Medicoes"]
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42)
-
-    model = LinearRegression()
-    model.fit(X_train, y_train)
-
-    # Avaliação do modelo
-    y_pred = model.predict(X_test)
+    # Avaliação do modelo: as medições da partição de teste (a mesma do
+    # train_test_split(test_size=0.2, random_state=42)) são ocultadas e inferidas
+    y = inspected["Medicoes"].to_numpy(dtype=np.float64)
+    n_test = int(np.ceil(0.2 * len(y)))
+    test = np.random.RandomState(42).permutation(len(y))[:n_test]
+    y_masked = y.copy()
+    y_masked[test] = np.nan
+    y_test = y[test]
+    residuals = y_test - impute_medicoes(inspected.assign(Medicoes=y_masked))[test]
+    ss_res = residuals @ residuals
+    ss_tot = ((y_test - y_test.mean()) ** 2).sum()
     print("[INFO] Métricas do modelo:")
-    print("  - MSE:", mean_squared_error(y_test, y_pred))
-    print("  - R²:", r2_score(y_test, y_pred))
-
-    # Inferir valores para ativos não inspecionados
-    if not not_inspected.empty:
-        not_inspected.loc[:, "Medicoes"] = model.predict(
-            not_inspected["Criticidade_Matriz"].values.reshape(-1, 1))
-
-    # Combinar resultados
-    final_data = pd.concat([inspected, not_inspected]
-                           ).sort_values(by="ID_Ativo")
+    print("  - MSE:", ss_res / len(y_test))
+    print("  - R²:", 1 - ss_res / ss_tot if ss_tot > 0 else np.nan)
+
+    # Inferir valores para ativos não inspecionados, usando todos os inspecionados.
+    # As linhas mantêm a ordem da base consolidada (já ordenada por ID_Ativo
+    # pela junção), sem concatenar e reordenar as duas partes
+    final_data = consolidated_data[valid | missing]
+    if missing.any():
+        final_data = final_data.assign(Medicoes=impute_medicoes(final_data))
+    if not final_data["ID_Ativo"].is_monotonic_increasing:
+        final_data = final_data.sort_values(by="ID_Ativo")
     final_data.to_csv(output_path, index=False)
     print(f"[SUCESSO] Inferências realizadas e salvas em: {output_path}")
     return final_data
@@ -8,23 +8,104 @@
 
 # Import de bibliotecas
 
+import csv
 import os
 from fpdf import FPDF
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from common import existing_files
+
+# Quantidade de linhas formatadas por vez na gravação do CSV
+CHUNK_SIZE = 200_000
+# Quantidade de linhas dos dados consolidados mostradas no relatório
+PREVIEW_ROWS = 10
 
 # Funções para geração de relatórios
 
 
-def consolidate_all_data(base_path, consolidated_path):
+def unify_column_types(tables):
+    """
+    Converte para texto as colunas cujo tipo difere entre as tabelas.
+
+    Tipos numéricos diferentes (ex.: int e float) são ampliados pela própria
+    concatenação; já combinações como texto em um arquivo e número em outro
+    não têm promoção no Arrow, e essas colunas passam a ser texto em todas as
+    tabelas (como o object do pd.concat).
+
+    Args:
+        tables (list): Tabelas Arrow a concatenar.
+
+    Returns:
+        list: As tabelas, com as colunas conflitantes convertidas para texto.
+    """
+    types = {}
+    for table in tables:
+        for field in table.schema:
+            types.setdefault(field.name, set()).add(field.type)
+    conflicting = {name for name, found in types.items()
+                   if len(found) > 1 and not all(
+                       pa.types.is_integer(t) or pa.types.is_floating(t)
+                       or pa.types.is_null(t) for t in found)}
+    if not conflicting:
+        return tables
+    unified = []
+    for table in tables:
+        for i, field in enumerate(table.schema):
+            if field.name in conflicting and not pa.types.is_string(field.type):
+                table = table.set_column(
+                    i, field.name, table.column(i).cast(pa.string()))
+        unified.append(table)
+    return unified
+
+
+def write_table_csv(table, path, chunk_size=CHUNK_SIZE):
+    """
+    Grava uma tabela Arrow em CSV com aspas apenas onde necessárias (como no pandas).
+
+    O cabeçalho é escrito pelo módulo csv e as linhas pelo escritor do PyArrow
+    sem aspas, que é o caso comum. Se algum valor contiver vírgula, aspas ou
+    quebra de linha (o PyArrow então recusa a gravação sem aspas), o arquivo é
+    regravado bloco a bloco pelo to_csv do pandas, que aplica aspas só nesses valores.
+
+    Args:
+        table (pa.Table): Tabela a gravar.
+        path (str): Caminho do arquivo CSV.
+        chunk_size (int): Quantidade de linhas gravadas por bloco.
+    """
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f, lineterminator="\n").writerow(table.column_names)
+    try:
+        with open(path, "ab") as f:
+            pacsv.write_csv(table, f, write_options=pacsv.WriteOptions(
+                include_header=False, batch_size=chunk_size, quoting_style="none"))
+    except pa.ArrowInvalid:
+        header = True
+        for batch in table.to_batches(max_chunksize=chunk_size):
+            batch.to_pandas().to_csv(path, mode="w" if header else "a",
+                                     header=header, index=False)
+            header = False
+
+
+def consolidate_all_data(base_path, consolidated_path, chunk_size=CHUNK_SIZE):
     """
-    Consolida todos os dados relevantes ao longo do projeto em um único DataFrame.
+    Consolida todos os dados relevantes ao longo do projeto em um único arquivo.
+
+    Cada arquivo é lido com o leitor de CSV do PyArrow (multi-thread) e as
+    tabelas Arrow são concatenadas sem cópia; as colunas do resultado são a
+    união das colunas de todos os arquivos, na ordem em que aparecem. O CSV
+    consolidado é gravado direto da tabela Arrow, pelo escritor de CSV do
+    PyArrow, sem converter os dados para pandas (ver write_table_csv); apenas
+    as primeiras linhas, usadas no relatório, viram um DataFrame.
 
     Args:
         base_path (str): Caminho base para os arquivos gerados ao longo do projeto.
         consolidated_path (str): Caminho para salvar os dados consolidados finais.
+        chunk_size (int): Quantidade de linhas gravadas por bloco.
 
     Returns:
-        pd.DataFrame: Dados consolidados finais.
+        pd.DataFrame: Primeiras linhas (PREVIEW_ROWS) dos dados consolidados
+            finais, com todas as colunas, usadas no relatório.
     """
     print("[INFO] Consolidando todos os dados...")
 
@@ -36,24 +117,37 @@ def consolidate_all_data(base_path, consolidated_path):
         os.path.join(base_path, "feedback_ajustes.csv")
     ]
 
-    # Verificar existência dos arquivos
-    dataframes = []
+    # Verificar existência dos arquivos (uma única listagem do diretório)
+    tables = []
+    present = existing_files(*files)
     for file in files:
-        if os.path.exists(file):
+        if file in present:
             print(f"[SUCESSO] Arquivo encontrado: {file}")
-            df = pd.read_csv(file)
-            df["Fonte"] = os.path.basename(file)
-            dataframes.append(df)
+            # Campos vazios viram nulos também nas colunas de texto, como no pandas
+            table = pacsv.read_csv(file, convert_options=pacsv.ConvertOptions(
+                strings_can_be_null=True))
+            tables.append(table.append_column(
+                "Fonte", pa.repeat(os.path.basename(file), table.num_rows)))
         else:
             print(f"[AVISO] Arquivo não encontrado: {file}")
 
-    # Consolidar todos os DataFrames
-    consolidated_data = pd.concat(dataframes, ignore_index=True)
-    consolidated_data.to_csv(consolidated_path, index=False)
+    # Consolidar todos os arquivos: colunas ausentes em um arquivo ficam nulas,
+    # tipos numéricos diferentes entre arquivos são ampliados (ex.: int -> float)
+    # e as demais divergências viram texto (ver unify_column_types)
+    temp_path = consolidated_path + ".tmp"
+    if not tables:  # Nenhum arquivo encontrado
+        preview = pd.DataFrame()
+        preview.to_csv(temp_path, index=False)
+    else:
+        consolidated = pa.concat_tables(unify_column_types(tables),
+                                        promote_options="permissive")
+        preview = consolidated.slice(0, PREVIEW_ROWS).to_pandas()
+        write_table_csv(consolidated, temp_path, chunk_size)
+    os.replace(temp_path, consolidated_path)
     print(f"[SUCESSO] Dados consolidados finais salvos em: {
           consolidated_path}")
 
-    return consolidated_data
+    return preview
 
 
 def generate_final_report(consolidated_data, output_path):
@@ -96,10 +190,12 @@ def generate_final_report(consolidated_data, output_path):
     pdf.cell(200, 10, txt="Resumo Consolidado de Dados", ln=True)
     pdf.ln(5)
 
-    columns = consolidated_data.columns
-    for i in range(min(10, len(consolidated_data))):  # Limitar a 10 linhas para visualização
-        row = consolidated_data.iloc[i]
-        row_text = " | ".join([f"{col}: {row[col]}" for col in columns])
+    # Limitar a 10 linhas para visualização; as linhas são convertidas de uma
+    # vez para um array NumPy, sem indexar o DataFrame a cada linha/coluna
+    head = consolidated_data.head(PREVIEW_ROWS)
+    columns = head.columns.tolist()
+    for row in head.to_numpy():
+        row_text = " | ".join([f"{col}: {value}" for col, value in zip(columns, row)])
         pdf.multi_cell(0, 10, txt=row_text)
         pdf.ln(2)
 
@@ -7,6 +7,7 @@
 import pandas as pd
 import numpy as np
 import os
+from common import EXCEL_OPTIONS, write_sheet_rows
 
 # Definir caminho correto para o diretório de saída
 output_dir = "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS"
@@ -26,23 +27,36 @@ def ensure_directory_exists(directory):
         os.makedirs(directory)
 
 
-def generate_simulated_data():
+def generate_simulated_data(n_rows=100, seed=42):
     """
     Gera uma base de dados simulada para ativos subterrâneos.
 
+    Todos os valores saem de um único gerador (np.random.default_rng). As
+    colunas de texto são sorteadas como códigos inteiros e montadas como
+    categorias, sem criar arrays de objetos Python.
+
+    Args:
+        n_rows (int): Quantidade de ativos simulados.
+        seed (int): Semente do gerador de números aleatórios.
+
     Returns:
         pd.DataFrame: DataFrame contendo os dados simulados.
     """
+    rng = np.random.default_rng(seed)
+
+    def sorteia(valores):
+        return pd.Categorical.from_codes(rng.integers(0, len(valores), n_rows), valores)
+
     data = {
-        "ID_Ativo": [f"A-{str(i).zfill(4)}" for i in range(1, 101)],
-        "Frequencia_Falhas": np.random.randint(0, 10, 100),
-        "Tempo_Operacao": np.random.uniform(0.5, 50.0, 100),
-        "Numero_Clientes_Afetados": np.random.choice([50, 100, 200, 500, 1000], 100),
-        "Tipo_Ativo": np.random.choice(["Transformador", "Religador", "Isolador", "Seccionalizador", "Cabo"], 100),
-        "Localidade": np.random.choice(["Zona Norte", "Zona Sul", "Centro", "Zona Oeste"], 100),
-        "Historico_Manutencao": np.random.choice(["Sim", "Não"], 100),
-        "Impacto_DEC_FEC": np.random.uniform(0.0, 50.0, 100),
-        "Data_Evento": pd.date_range(start="1990-01-01", periods=100).to_list()
+        "ID_Ativo": [f"A-{str(i).zfill(4)}" for i in range(1, n_rows + 1)],
+        "Frequencia_Falhas": rng.integers(0, 10, n_rows),
+        "Tempo_Operacao": rng.uniform(0.5, 50.0, n_rows),
+        "Numero_Clientes_Afetados": np.array([50, 100, 200, 500, 1000])[rng.integers(0, 5, n_rows)],
+        "Tipo_Ativo": sorteia(["Transformador", "Religador", "Isolador", "Seccionalizador", "Cabo"]),
+        "Localidade": sorteia(["Zona Norte", "Zona Sul", "Centro", "Zona Oeste"]),
+        "Historico_Manutencao": sorteia(["Sim", "Não"]),
+        "Impacto_DEC_FEC": rng.uniform(0.0, 50.0, n_rows),
+        "Data_Evento": pd.date_range(start="1990-01-01", periods=n_rows)
     }
     return pd.DataFrame(data)
 
@@ -61,7 +75,9 @@ df.to_csv(output_csv, index=False)
 print(f"Base CSV salva em: {output_csv}")
 
 # Salvar como Excel
-df.to_excel(output_xlsx, index=False)
+with pd.ExcelWriter(output_xlsx, engine="xlsxwriter",
+                    engine_kwargs={"options": EXCEL_OPTIONS}) as writer:
+    write_sheet_rows(writer, "Sheet1", df)
 print(f"Base Excel salva em: {output_xlsx}")
 
 # Salvar como JSON
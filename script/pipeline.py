@@ -0,0 +1,34 @@
+'''
+    REDE_SUB
+
+        ||> Objetivo: executar o Épico 1 (ep1_sp1 -> ep1_sp2 -> ep1_sp4) em uma única passada.
+
+            |> A base histórica é carregada uma única vez (via cache Parquet) e repassada
+               para a função run() de cada etapa, evitando reler e reprocessar o CSV a cada script.
+            |> O painel interativo (ep1_sp3) continua sendo executado separadamente.
+'''
+
+# Import de bibliotecas
+
+import os
+import ep1_sp1_explora_dados
+import ep1_sp2_mod_criticidade
+import ep1_sp4_relatorios
+from common import load_hist
+
+# Caminho do arquivo de dados
+data_path = "/Users/accol/Library/Mobile Documents/com~apple~CloudDocs/UNIVERSIDADES/UFF/PROJETOS/LIGHT/REDE_ATIVOS/REDE_SUB/script/DADOS/historico_light.csv"
+
+
+if __name__ == "__main__":
+    # Verifica se o arquivo de dados existe
+    if not os.path.exists(data_path):
+        raise FileNotFoundError(
+            f"Arquivo de dados não encontrado no caminho: {data_path}")
+
+    df = load_hist(data_path)
+    print("Dados carregados com sucesso.")
+
+    ep1_sp1_explora_dados.run(df)
+    criticidade = ep1_sp2_mod_criticidade.run(df)
+    ep1_sp4_relatorios.run(df, criticidade=criticidade)